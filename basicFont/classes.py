@@ -1,13 +1,110 @@
+import collections
+import time
+import weakref
 from basicObject import *
 from .constants import *
 
 
+class FontRegistry:
+    """
+    the fonts of all the messages, every (file, size) is read from the disk once and shared
+    """
+    def __init__(self):
+        self._fonts: Dict[Tuple[str, int], pygame.font.Font] = {}
+        self.hits = 0
+        self.misses = 0
+        self.load_time = 0.0
+
+    def __len__(self):
+        return len(self._fonts)
+
+    def get(self, file: str, size: int) -> pygame.font.Font:
+        font = self._fonts.get((file, size))
+        if font is not None:
+            self.hits += 1
+            return font
+        self.misses += 1
+        start = time.perf_counter()
+        font = pygame.font.Font(asset_path(file), size)
+        self.load_time += time.perf_counter() - start
+        self._fonts[(file, size)] = font
+        return font
+
+    def warm_up(self, sizes: Iterable[int], files: Iterable[str] = (TEXT_FONT,)):
+        """
+        load the fonts of the sizes before the first screen needs them
+        """
+        for file in files:
+            for size in sizes:
+                if (file, size) not in self._fonts:
+                    self.get(file, size)
+
+    def clear(self):
+        self._fonts.clear()
+
+
+fonts = FontRegistry()
+
+
+class TextCache:
+    """
+    the rendered texts of all the messages, least recently used first, bounded by the bytes of the surfaces.
+    the surfaces are shared, so they must not be drawn on
+    """
+    def __init__(self, max_bytes: int = TEXT_CACHE_BYTES):
+        self._surfaces: collections.OrderedDict[tuple, pygame.Surface] = collections.OrderedDict()
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    @property
+    def bytes(self):
+        return self._bytes
+
+    @staticmethod
+    def _surface_bytes(surface: pygame.Surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def render(self, font: pygame.font.Font, font_key, text: str, color, antialias: bool = True) -> pygame.Surface:
+        """
+        :param font_key: the (file, size) of the font
+        :return: the text rendered with the font, from the cache if it was rendered before
+        """
+        color = tuple([int(item) for item in color])
+        key = (font_key, text, color, antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        self._bytes += self._surface_bytes(surface)
+        while self._bytes > self._max_bytes and len(self._surfaces) > 1:
+            _, old = self._surfaces.popitem(last=False)
+            self._bytes -= self._surface_bytes(old)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+        self._bytes = 0
+
+
+text_cache = TextCache()
+
+
 class Message(ScreenObject):
     def __init__(self, pos: POSITION, text: str, size: int, color: COLOR, position_at: str = TOPLEFT, title=False):
         self._text = text
         self._color = color
-        self._text_font = pygame.font.Font(TITLE_FONT if title else TEXT_FONT, size)
-        self._text_surf = self._text_font.render(text, True, color)
+        self._font_key = (TITLE_FONT if title else TEXT_FONT, size)
+        self._text_font = fonts.get(*self._font_key)
+        self._text_surf = self._render()
         super(Message, self).__init__(pos, self.text_surf.get_size(), position_at)
         self._played_sound = False
 
@@ -31,6 +128,9 @@ class Message(ScreenObject):
     def _play_sound(self):
         self._played_sound = True
 
+    def _render(self):
+        return text_cache.render(self._text_font, self._font_key, self._text, self._color)
+
     @property
     def text(self):
         return self._text
@@ -42,7 +142,7 @@ class Message(ScreenObject):
     @color.setter
     def color(self, color):
         self._color = color
-        self._text_surf = self._text_font.render(self._text, True, self._color)
+        self._text_surf = self._render()
 
     @property
     def text_surf(self):
@@ -52,11 +152,13 @@ class Message(ScreenObject):
     def text(self, text: str):
         if not self._text == text:
             self._text = text
-            self._text_surf = self._text_font.render(text, True, self._color)
+            self._text_surf = self._render()
             self._size = self.text_surf.get_size()
 
 
 class Clicker(ImageObject):
+    _colored = weakref.WeakKeyDictionary()  # source image -> {(src color, dst color): colored image}
+
     def __init__(self, pos, image: str | pygame.Surface, size=0, direction=0, color_key=WHITE, position_at=TOPLEFT):
         super(Clicker, self).__init__(pos, image, size, direction, color_key, position_at)
 
@@ -64,13 +166,24 @@ class Clicker(ImageObject):
         pygame.draw.rect(screen, RED, self.rect, 5)
 
     def copy_color(self, src_color, dst_color):
-        w, h = self.size
-        img = self._image.copy()
-        for x in range(w):
-            for y in range(h):
-                if img.get_at((x, y))[:-1] == src_color:
-                    img.set_at((x, y), dst_color)
-        return Clicker(self._pos, img, 0, self._direction, self._color_key, self._position_at)
+        """
+        :return: a copy of the clicker with dst_color instead of every src_color pixel.
+                 the colored images are cached by the source image, src_color and dst_color
+        """
+        colored = Clicker._colored.setdefault(self._image, {})
+        key = (tuple(src_color), tuple(dst_color))
+        if key not in colored:
+            img = self._image.copy()
+            pixels = pygame.surfarray.pixels3d(img)
+            mask = (pixels == key[0][:3]).all(axis=2)
+            pixels[mask] = key[1][:3]
+            del pixels
+            if img.get_flags() & pygame.SRCALPHA:
+                alpha = pygame.surfarray.pixels_alpha(img)
+                alpha[mask] = key[1][3] if len(key[1]) > 3 else 255
+                del alpha
+            colored[key] = img
+        return Clicker(self._pos, colored[key], 0, self._direction, self._color_key, self._position_at)
 
     def copy(self):
         return Clicker(self._pos, self._image.copy(), 0, self._direction, self._color_key, self._position_at)
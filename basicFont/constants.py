@@ -1,2 +1,4 @@
 TITLE_FONT: str = r'files\fonts\title_font.ttf'
 TEXT_FONT: str = r'files\fonts\text_font.ttf'
+
+TEXT_CACHE_BYTES = 8 * 1024 * 1024
@@ -76,7 +76,7 @@ class CircleObject(ScreenObject):
 class ImageObject(ScreenObject):
     def __init__(self, pos, image: str | pygame.Surface, size: int = 0, direction=0, color_key=WHITE,
                  position_at: str = TOPLEFT):
-        self._image = pygame.image.load(image) if type(image) == str else image.copy()
+        self._image = (assets.image(image) if type(image) == str else image).copy()
         self._color_key = color_key
         if color_key:
             self._image = self._image.convert()
@@ -86,6 +86,7 @@ class ImageObject(ScreenObject):
             self._image = pygame.transform.scale(self._image, new_size)
         super(ImageObject, self).__init__(pos, self._image.get_size(), position_at)
         self._direction = direction
+        self._rotations: Dict[int, pygame.Surface] = {}
 
     @property
     def size(self):
@@ -95,14 +96,27 @@ class ImageObject(ScreenObject):
     def size(self, size):
         self._image = pygame.transform.scale(self._image, size)
         self._size = self._image.get_size()
+        self._rotations = {}
 
     @property
     def direction(self):
         return self._direction
 
+    @property
+    def image(self):
+        return self._image
+
     @property
     def _display_image(self):
-        return pygame.transform.rotate(self._image, self._direction)
+        """
+        the image rotated to the direction, every rotation is made once until the size changes.
+        direction 0 is the image itself, so changes of its pixels are drawn too
+        """
+        if self._direction % 360 == 0:
+            return self._image
+        if self._direction not in self._rotations:
+            self._rotations[self._direction] = pygame.transform.rotate(self._image, self._direction)
+        return self._rotations[self._direction]
 
     def draw(self, screen):
         screen.blit(self._display_image, self._pos)
@@ -115,3 +129,55 @@ class ImageObject(ScreenObject):
         self._pos = pos
         if direction is not None:
             self._direction = direction
+
+
+class DirtyRects:
+    """
+    the rects of the screen that were drawn since the last display update, so only them are sent to the window.
+    the whole window is sent after full (a new screen, a reset or a resize) or when there are too many rects
+    """
+    def __init__(self, limit: int = DIRTY_RECTS_LIMIT):
+        self._rects: List[pygame.Rect] = []
+        self._limit = limit
+        self._full = True
+
+    def __len__(self):
+        return len(self._rects)
+
+    @property
+    def is_full(self):
+        return self._full
+
+    @property
+    def rects(self):
+        return self._rects
+
+    def add(self, rect: pygame.Rect):
+        if not self._full and rect:
+            self._rects.append(rect)
+            if len(self._rects) > self._limit:
+                self.full()
+
+    def extend(self, rects: Iterable[pygame.Rect]):
+        if not self._full:
+            self._rects.extend(rects)
+            if len(self._rects) > self._limit:
+                self.full()
+
+    def full(self):
+        self._full = True
+        self._rects = []
+
+    def update(self):
+        """
+        send the drawn rects (or the whole window) to the display, instead of pygame.display.flip
+        """
+        if self._full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self._rects)
+        self._full = False
+        self._rects = []
+
+
+dirty_rects = DirtyRects()
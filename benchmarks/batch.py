@@ -0,0 +1,69 @@
+"""
+benchmark of the vectorised BatchSimulation, and a consistency check against the per-object Simulation
+run from the project root: python -m benchmarks.batch
+"""
+import time
+import random
+from game import *
+
+
+def consistency(survival: bool, moves: int = 5000, seed: int = 0):
+    """
+    play the same random inputs on a Simulation and on a one game BatchSimulation,
+    the food of the batch is copied from the simulation, everything else must match after every movement
+    """
+    random.seed(seed)
+    size = get_resolution()
+    simulation = SurvivalSimulation(size, seed) if survival else Simulation(size, seed)
+    batch = BatchSimulation(size, 1, survival, seed)
+    snake = simulation.snakes[0]
+    keys = {DIR_UP: pygame.K_UP, DIR_DOWN: pygame.K_DOWN, DIR_LEFT: pygame.K_LEFT, DIR_RIGHT: pygame.K_RIGHT}
+    games = 0
+    batch.set_food(0, simulation.grid.cell(simulation.foods[0].pos))
+    for move in range(moves):
+        direction = random.choice(list(keys)) if random.random() < 0.2 else NO_DIRECTION
+        inputs = [(0, keys[direction])] if direction != NO_DIRECTION else []
+        over = False
+        try:
+            for _ in range(MOVEMENT_COUNTER):
+                simulation.step(inputs)
+                inputs = []
+        except UserDsq:
+            over = True
+        ended = batch.step(np.array([direction]))
+        assert over == (len(ended) == 1), f'move {move}: game over mismatch'
+        if over:
+            games += 1
+            simulation.reset()
+            batch.reset()
+        else:
+            assert tuple(batch.heads[0]) == simulation.grid.cell(snake.pos), f'move {move}: head mismatch'
+            assert batch.lengths[0] == len(snake), f'move {move}: length mismatch'
+            cells = simulation.grid._cells[:, :simulation.grid.play_height] == snake.grid_kind
+            assert (cells == (batch.board[0] == BATCH_SNAKE)).all(), f'move {move}: body mismatch'
+        batch.set_food(0, simulation.grid.cell(simulation.foods[0].pos))
+    print(f"consistency {'survival' if survival else 'classic'}: {moves} moves, {games} games, ok")
+
+
+def benchmark(games: int, survival: bool, seconds: float = 3):
+    batch = BatchSimulation(get_resolution(), games, survival, 0)
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        directions = rng.integers(-4, 4, games).clip(NO_DIRECTION)
+        batch.step(directions)
+        batch.reset(batch.done)
+    elapsed = time.perf_counter() - start
+    print(f"{games} {'survival' if survival else 'classic'} games: {batch.ticks / elapsed:,.0f} game-ticks/s")
+
+
+def main():
+    for survival in [False, True]:
+        consistency(survival)
+    for games in [1, 256, 4096]:
+        for survival in [False, True]:
+            benchmark(games, survival)
+
+
+if __name__ == '__main__':
+    main()
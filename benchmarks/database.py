@@ -0,0 +1,151 @@
+"""
+benchmark of the users database on big databases: the size and decode time of the skin blobs, the
+migration of old (pickled) skins, the login latency and the start time
+run from the project root: python -m benchmarks.database
+"""
+import os
+import pickle
+import random
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from settings import *
+from settings.database import *
+
+
+def create_users(file_name: str, users: int, batch: int = 10000, skin_size: int = DEFAULT_BLOCK_SIZE,
+                 version: int = 0):
+    """
+    fill a new database with users, like a database made before the username index
+    :param version: the skins format, 0 for the old format (pickled arrays)
+    """
+    Database(file_name).close()
+    rng = np.random.default_rng(0)
+    skins = [rng.integers(0, 256, (skin_size, skin_size, 3), dtype=np.uint8) for _ in range(16)]
+    skins = [encode_skin(skin) if version else pickle.dumps(skin) for skin in skins]
+    connection = sqlite3.connect(file_name)
+    connection.execute(f'DROP INDEX {USERS_USERNAME_INDEX};')
+    command = f'{INSERT_COMMAND} {TABLE_USERS} VALUES (?, ?, ?, ?, ?, ?, ?);'
+    for start in range(0, users, batch):
+        connection.executemany(command, [(index, f'user{index}', 'password', *[skins[(index + part) % len(skins)]
+                                                                            for part in range(4)])
+                                         for index in range(start, min(start + batch, users))])
+        connection.commit()
+    connection.execute(f'PRAGMA user_version = {version};')
+    connection.commit()
+    connection.close()
+
+
+def skins(users: int = 100000, sample: int = 10000):
+    with tempfile.TemporaryDirectory() as folder:
+        file_name = os.path.join(folder, 'users.db')
+        create_users(file_name, users)
+        connection = sqlite3.connect(file_name)
+        command = f'{SELECT_COMMAND} {USER_HEAD1}, {USER_HEAD2}, {USER_BODY1}, {USER_BODY2} FROM {TABLE_USERS} LIMIT ?;'
+        old = [blob for row in connection.execute(command, [sample]).fetchall() for blob in row]
+        connection.close()
+        start = time.perf_counter()
+        Database(file_name).close()
+        migration = time.perf_counter() - start
+        connection = sqlite3.connect(file_name)
+        new = [blob for row in connection.execute(command, [sample]).fetchall() for blob in row]
+        connection.close()
+        assert all([np.array_equal(pickle.loads(a), decode_skin(b)) for a, b in zip(old, new)])
+        decode_times = []
+        for blobs, decode in [(old, pickle.loads), (new, decode_skin)]:
+            start = time.perf_counter()
+            for blob in blobs:
+                decode(blob)
+            decode_times.append((time.perf_counter() - start) / len(blobs) * 4)
+        print(f'{users:,} users: skins of a user {sum(map(len, old[:4])):,} bytes pickled, '
+              f'{sum(map(len, new[:4])):,} bytes as skin blobs; decode of a user {decode_times[0] * 1e6:.1f} us '
+              f'pickled, {decode_times[1] * 1e6:.1f} us from the blobs; migration {migration:.1f} s')
+
+
+def old_login(connection: sqlite3.Connection, username: str, password: str):
+    """
+    the login before the username index: a scan for the id of the user, and all the passwords in a list
+    """
+    index, = connection.execute(f'{SELECT_COMMAND} {INDEX} FROM {TABLE_USERS} WHERE {USER_USERNAME} = ?;',
+                                [username]).fetchone()
+    passwords = [p for p, in connection.execute(f'{SELECT_COMMAND} {USER_PASSWORD} FROM {TABLE_USERS} '
+                                                 f'ORDER BY {INDEX};').fetchall()]
+    return passwords[index] == password
+
+
+def login(users: int, logins: int = 1000, old_logins: int = 3):
+    """
+    the skins of the users are 1x1 so 10M users fit on the disk, the table scans of the old login read ~4KB less
+    per user than in a real database
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        file_name = os.path.join(folder, 'users.db')
+        create_users(file_name, users, 100000, 1, SKIN_VERSION)
+        names = random.Random(0).choices(range(users), k=logins)
+        connection = sqlite3.connect(file_name)
+        start = time.perf_counter()
+        for index in names[:old_logins]:
+            assert old_login(connection, f'user{index}', 'password')
+        old = (time.perf_counter() - start) / old_logins
+        connection.close()
+        start = time.perf_counter()
+        database = Database(file_name)
+        index_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for index in names:
+            assert database.password(f'user{index}') == 'password'
+        new = (time.perf_counter() - start) / logins
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            start = time.perf_counter()
+            for index in names:
+                assert executor.submit(database.password, f'user{index}').result() == 'password'
+            worker = (time.perf_counter() - start) / logins
+        database.close()
+        print(f'{users:,} users: login {old * 1000:.1f} ms before the index, {new * 1e6:.1f} us with the index, '
+              f'{worker * 1e6:.1f} us on the worker thread; index build {index_time:.1f} s')
+
+
+def old_tables_id(connection: sqlite3.Connection):
+    """
+    the start before the ids were given by sqlite: all the ids of every table in a list, for the next id
+    """
+    tables = connection.execute("SELECT name FROM sqlite_schema WHERE type ='table' AND name NOT LIKE 'sqlite_%';")
+    return {table: max([index for index, in connection.execute(f'{SELECT_COMMAND} {INDEX} FROM {table} DESC;')],
+                       default=-1) + 1
+            for table, in tables.fetchall()}
+
+
+def startup(users: int, starts: int = 10):
+    with tempfile.TemporaryDirectory() as folder:
+        file_name = os.path.join(folder, 'users.db')
+        create_users(file_name, users, 100000, 1, SKIN_VERSION)
+        Database(file_name).close()     # build the username index, once
+        connection = sqlite3.connect(file_name)
+        start = time.perf_counter()
+        for _ in range(starts):
+            assert old_tables_id(connection)[TABLE_USERS] == users
+        old = (time.perf_counter() - start) / starts
+        connection.close()
+        start = time.perf_counter()
+        for _ in range(starts):
+            Database(file_name).close()
+        new = (time.perf_counter() - start) / starts
+        database = Database(file_name)
+        database.add_user('new user', 'password')
+        assert database.user_id('new user') == users
+        database.close()
+        print(f'{users:,} users: start {old * 1000:.1f} ms with the ids scan, {new * 1000:.2f} ms with the ids '
+              f'given by sqlite')
+
+
+def main():
+    skins()
+    for users in [10000, 1000000, 10000000]:
+        login(users)
+    for users in [10000, 1000000, 10000000]:
+        startup(users)
+
+
+if __name__ == '__main__':
+    main()
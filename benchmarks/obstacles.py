@@ -0,0 +1,72 @@
+"""
+benchmark of the obstacles mode with many obstacles: the time of a frame of the obstacle field (step and draw)
+against the frame time of the configured refresh rate, and the memory of a long session with the obstacle pool
+run from the project root: python -m benchmarks.obstacles
+"""
+import time
+import tracemalloc
+from game import *
+
+
+class PoolSimulation(ObstaclesSimulation):
+    limit = OBSTACLES_LIMIT
+    max_age = OBSTACLE_MAX_AGE
+
+    def _create_obstacles(self):
+        return ObstacleField(self._grid, self._random, self.limit, self.max_age)
+
+
+def benchmark(obstacles: int, frames: int = 200, scale: int = 8):
+    """
+    :param scale: the board is scale times wider and higher than the game window, so the obstacles fit on it
+    """
+    width, height = get_resolution()
+    simulation = ObstaclesSimulation((width * scale, height * scale), 0)
+    screen = pygame.Surface(simulation.grid.size)
+    while len(simulation.obstacles) < obstacles:
+        simulation.add_obstacle()
+        for _ in range(2):
+            simulation._update_obstacles()
+    start = time.perf_counter()
+    for _ in range(frames):
+        simulation._update_obstacles()
+    step = (time.perf_counter() - start) / frames
+    start = time.perf_counter()
+    for _ in range(frames):
+        simulation.obstacles.draw(screen)
+    draw = (time.perf_counter() - start) / frames
+    budget = 1 / settings.refresh_rate
+    print(f'{obstacles} obstacles: step {step * 1000:.2f} ms, draw {draw * 1000:.2f} ms, '
+          f'{(step + draw) / budget:.0%} of a {settings.refresh_rate} fps frame')
+
+
+def session(frames: int, interval: int = 8, limit: int = 64, max_age: int = 600):
+    """
+    spawn an obstacle every interval frames, far beyond the pool limit, and follow the memory
+    """
+    PoolSimulation.limit, PoolSimulation.max_age = limit, max_age
+    simulation = PoolSimulation(get_resolution(), 0)
+    screen = pygame.Surface(simulation.grid.size)
+    tracemalloc.start()
+    memory = []
+    for frame in range(frames):
+        if frame % interval == 0:
+            simulation.add_obstacle()
+        simulation._update_obstacles()
+        simulation.obstacles.draw(screen)
+        if frame % (frames // 5) == 0:
+            memory.append(tracemalloc.get_traced_memory()[0])
+    tracemalloc.stop()
+    print(f'{frames // interval} spawns with a pool of {limit} (max age {max_age}): '
+          f'{len(simulation.obstacles)} obstacles at the end, '
+          f"traced memory {', '.join([f'{size / 1024:.0f}' for size in memory])} KiB")
+
+
+def main():
+    for obstacles in [1, 100, 500, 1000]:
+        benchmark(obstacles)
+    session(5000)
+
+
+if __name__ == '__main__':
+    main()
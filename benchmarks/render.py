@@ -0,0 +1,71 @@
+"""
+benchmark of the game rendering at 1080p: the display update of the whole window every frame (pygame.display.flip)
+against the update of the dirty rects only (dirty_rects.update)
+run from the project root: python -m benchmarks.render
+"""
+import time
+from game import *
+
+RESOLUTION = 1080
+
+
+def benchmark(mode: str, dirty: bool, frames: int = 1000, seed: int = 0):
+    """
+    play the mode with random keys and draw every frame like play_game
+    :return: the mean time of a frame (draw and display update), of the display update alone, and the mean part of
+             the window that was sent to the display
+    """
+    keys = random.Random(seed)
+    screen = pygame.display.set_mode(get_resolution())
+    data = DataManager()
+    data.reset(screen)
+    simulation = GAME_MODES[mode](screen.get_size(), seed)
+    screen.fill(settings.background_color)
+    data_zone = DataZone(screen, data, simulation)
+    data_zone.pause = False
+    dirty_rects.full()
+    window = screen.get_width() * screen.get_height()
+    frame_time = update_time = area = 0
+    for _ in range(frames):
+        start = time.perf_counter()
+        inputs = [(snake.index, keys.choice(REPLAY_KEYS)) for snake in simulation.snakes if keys.random() < 0.05]
+        try:
+            simulation.step(inputs)
+        except UserDsq:
+            screen.fill(settings.background_color)
+            simulation.reset()
+            data_zone.reset(screen)
+            data_zone.pause = False
+            dirty_rects.full()
+        draw_simulation(screen, data, simulation)
+        data_zone.draw(screen)
+        data.draw(screen)
+        area += window if dirty_rects.is_full else sum([rect.width * rect.height for rect in dirty_rects.rects])
+        update_start = time.perf_counter()
+        if dirty:
+            dirty_rects.update()
+        else:
+            dirty_rects.full()
+            pygame.display.flip()
+        end = time.perf_counter()
+        update_time += end - update_start
+        frame_time += end - start
+    return frame_time / frames, update_time / frames, area / frames / window
+
+
+def main():
+    pygame.init()
+    params = settings.game_params
+    settings.set_game_params((RESOLUTION,) + params[1:])
+    try:
+        for mode in ['classic', 'obstacles', 'battle']:
+            for dirty in [False, True]:
+                frame, update, area = benchmark(mode, dirty)
+                print(f"{mode} {'dirty rects' if dirty else 'flip'}: frame {frame * 1000:.2f} ms, "
+                      f"display update {update * 1000:.2f} ms, {area:.1%} of the window updated")
+    finally:
+        settings.set_game_params(params)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+benchmark of the replay recording: size per key press, headless playback speed, and a check that the
+playback ends exactly like the recorded game
+run from the project root: python -m benchmarks.replay
+"""
+import time
+from game import *
+
+
+def record(mode: str, seed: int, max_ticks: int = 20000):
+    """
+    play one game of the mode with random keys, like play_game does
+    :return: the replay and the simulation at the end of the game
+    """
+    keys = random.Random(seed)
+    simulation = GAME_MODES[mode](get_resolution())
+    replay = start_replay(simulation)
+    try:
+        while replay.ticks < max_ticks:
+            inputs = [(snake.index, keys.choice(REPLAY_KEYS)) for snake in simulation.snakes
+                      if keys.random() < 0.05]
+            replay.record(inputs)
+            simulation.step(inputs)
+    except UserDsq:
+        pass
+    return replay, simulation
+
+
+def state(simulation: Simulation):
+    return ([(snake.pos, len(snake), snake.dsq) for snake in simulation.snakes],
+            [food.pos for food in simulation.foods], simulation.obstacles.positions.tolist(),
+            simulation.timer.value)
+
+
+def main(games: int = 20):
+    for mode in GAME_MODES:
+        replays = []
+        for seed in range(games):
+            replay, simulation = record(mode, seed)
+            replay = Replay.loads(replay.dumps())
+            assert state(run_replay(replay)) == state(simulation), f'{mode} game {seed}: playback mismatch'
+            replays.append(replay)
+        events = sum([len(list(replay.events())) for replay in replays])
+        size = sum([len(replay) for replay in replays])
+        ticks = sum([replay.ticks for replay in replays])
+        start = time.perf_counter()
+        for replay in replays:
+            run_replay(replay)
+        elapsed = time.perf_counter() - start
+        print(f'{mode}: {games} games, {events / games:.0f} keys per game, {size / events:.2f} bytes per key, '
+              f'header {REPLAY_HEADER.size} bytes, playback {ticks / elapsed:,.0f} frames/s')
+
+
+if __name__ == '__main__':
+    main()
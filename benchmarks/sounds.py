@@ -0,0 +1,44 @@
+"""
+benchmark of the sound bank: the preload of the sound files, and the time of a play when the file is decoded on
+every play against a play of the preloaded sound
+run from the project root: python -m benchmarks.sounds
+"""
+import time
+from font import *
+
+PLAYS = [(SNAKE_CHANNEL, REDIRECT_SOUND), (FOOD_CHANNEL, EAT_SOUND), (BUTTON_CHANNEL, BUTTON_SOUND),
+         (TEMP_MSG_CHANNEL, ERROR_SOUND)]
+
+
+def benchmark(plays: int = 200):
+    """
+    :return: the mean time of a play with the file decoded on every play, and of a play from the bank
+    """
+    start = time.perf_counter()
+    for index in range(plays):
+        channel_number, sound_file = PLAYS[index % len(PLAYS)]
+        pygame.mixer.Channel(channel_number).play(pygame.mixer.Sound(asset_path(sound_file)))
+    decode = (time.perf_counter() - start) / plays
+    start = time.perf_counter()
+    for index in range(plays):
+        play_sound(*PLAYS[index % len(PLAYS)])
+    bank = (time.perf_counter() - start) / plays
+    return decode, bank
+
+
+def main():
+    pygame.init()
+    sounds.clear()
+    sounds.preload(skip=[BACKGROUND_SOUND])
+    print(sounds.report())
+    decode, bank = benchmark()
+    print(f'play: {decode * 1000:.2f} ms decoding the file, {bank * 1000:.3f} ms from the bank')
+    sounds.volume = 0.5
+    sounds.set_volume(SNAKE_CHANNEL, 0.5)
+    volumes = [pygame.mixer.Channel(channel_number).get_volume() for channel_number in SOUND_VOLUMES]
+    print(f'volume of the bank 0.5, of the snake category 0.5: channel volumes {volumes}')
+    print(sounds.report())
+
+
+if __name__ == '__main__':
+    main()
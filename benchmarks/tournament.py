@@ -0,0 +1,33 @@
+"""
+benchmark of the tournament runner: the matches per second with 1, 2, 4, ... worker processes, up to twice the
+number of cores
+run from the project root: python -m benchmarks.tournament
+"""
+import os
+import time
+from tournament import *
+
+
+def benchmark(workers: int, matches: int):
+    """
+    :return: the matches per second
+    """
+    start = time.perf_counter()
+    results = list(run_tournament(list(POLICIES), matches, workers=workers))
+    return len(results) / (time.perf_counter() - start)
+
+
+def main(matches: int = 50):
+    cores = os.cpu_count()
+    workers = 1
+    base = None
+    while workers <= cores * 2:
+        rate = benchmark(workers, matches)
+        base = base or rate
+        print(f'{workers} workers ({cores} cores): {rate:.2f} matches/s, speedup {rate / base:.2f}, '
+              f'efficiency {rate / base / min(workers, cores):.0%}')
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
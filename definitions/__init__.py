@@ -1,2 +1,3 @@
 from .functions import *
+from .classes import *
 from .exceptions import *
@@ -0,0 +1,129 @@
+import time
+from .functions import *
+
+
+class SoundBank:
+    """
+    the decoded sounds of the game, every file is read from the disk once (on preload or on its first play).
+    every channel is a category (buttons, snake, food...) with its own volume, a play is scaled by the volume of its
+    category and the volume of the bank (the volume bar)
+    """
+    def __init__(self):
+        self._sounds: Dict[str, pygame.mixer.Sound] = {}
+        self._volumes: Dict[int, float] = dict(SOUND_VOLUMES)
+        self._volume = 1.0
+        self.hits = 0
+        self.misses = 0
+        self.load_time = 0.0
+
+    def __len__(self):
+        return len(self._sounds)
+
+    def get(self, sound_file: str) -> pygame.mixer.Sound:
+        key = asset_path(sound_file)
+        sound = self._sounds.get(key)
+        if sound is not None:
+            self.hits += 1
+            return sound
+        self.misses += 1
+        start = time.perf_counter()
+        sound = pygame.mixer.Sound(key)
+        self.load_time += time.perf_counter() - start
+        self._sounds[key] = sound
+        return sound
+
+    def preload(self, folder: str = SOUNDS_FOLDER, skip: Iterable[str] = ()):
+        """
+        decode every sound file of the folder
+        :param skip: files that are not played as sounds (the background music is streamed)
+        """
+        skip = [asset_path(sound_file) for sound_file in skip]
+        for name in sorted(os.listdir(asset_path(folder))):
+            sound_file = os.path.join(folder, name)
+            if os.path.splitext(name)[1] in SOUND_SUFFIXES and asset_path(sound_file) not in skip:
+                self.get(sound_file)
+
+    @property
+    def volume(self):
+        return self._volume
+
+    @volume.setter
+    def volume(self, volume: float):
+        """
+        the volume of the bank (0 to 1), the sounds that are playing change their volume too
+        """
+        self._volume = volume
+        for channel_number in self._volumes:
+            self._apply_volume(channel_number)
+
+    def set_volume(self, channel_number: int, volume: float):
+        """
+        the volume of the category of the channel (0 to 1), the sound that is playing changes its volume too
+        """
+        self._volumes[channel_number] = volume
+        self._apply_volume(channel_number)
+
+    def _apply_volume(self, channel_number: int):
+        if pygame.mixer.get_init():
+            pygame.mixer.Channel(channel_number).set_volume(self._volume * self._volumes.get(channel_number, 1))
+
+    def play(self, channel_number: int, sound_file: str):
+        self._apply_volume(channel_number)
+        pygame.mixer.Channel(channel_number).play(self.get(sound_file))
+
+    def report(self):
+        return f'sounds: {len(self)} loaded in {self.load_time * 1000:.1f} ms, {self.hits} hits, {self.misses} misses'
+
+    def clear(self):
+        self._sounds.clear()
+
+
+sounds = SoundBank()
+
+
+class AssetManager:
+    """
+    the images of the project files, every file is loaded once and converted to the pixel format of the display
+    (convert_alpha for images with transparent pixels), with its scaled variants.
+    the surfaces are shared, so they must not be drawn on
+    """
+    def __init__(self):
+        self._images: Dict[str, pygame.Surface] = {}
+        self._converted: Set[str] = set()
+        self._scaled: Dict[Tuple[str, POSITION], pygame.Surface] = {}
+
+    def image(self, path: str) -> pygame.Surface:
+        """
+        :return: the image of the file, converted once there is a display
+        """
+        key = asset_path(path)
+        if key not in self._images:
+            self._images[key] = pygame.image.load(key)
+        if key not in self._converted and pygame.display.get_surface() is not None:
+            image = self._images[key]
+            self._images[key] = image.convert_alpha() if image.get_flags() & pygame.SRCALPHA else image.convert()
+            self._converted.add(key)
+            self._scaled = {scaled_key: scaled for scaled_key, scaled in self._scaled.items() if scaled_key[0] != key}
+        return self._images[key]
+
+    def scaled(self, path: str, size: POSITION) -> pygame.Surface:
+        """
+        :return: the image scaled to the size (of a screen resolution or a block size), every size is scaled once
+        """
+        image = self.image(path)
+        key = (asset_path(path), tuple(size))
+        if key not in self._scaled:
+            self._scaled[key] = pygame.transform.scale(image, size)
+        return self._scaled[key]
+
+    def clear(self):
+        self._images.clear()
+        self._converted.clear()
+        self._scaled.clear()
+
+
+assets = AssetManager()
+
+
+def play_sound(channel_number: int, sound_file: str):
+    sounds.play(channel_number, sound_file)
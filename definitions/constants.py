@@ -1,7 +1,10 @@
 from typing import *
+import os
 import pygame
 
 
+ROOT_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 COLOR = Tuple[int, int, int]
 POSITION = Tuple[int, int]
 
@@ -45,9 +48,16 @@ P2_CVT_KEYS = {pygame.K_w: pygame.K_UP,
                pygame.K_d: pygame.K_RIGHT,
                pygame.K_a: pygame.K_LEFT}
 
+SOUNDS_FOLDER = r'files\sounds'
+SOUND_SUFFIXES: List[str] = ['.ogg', '.wav']
+
 TEMP_MSG_CHANNEL = 0
 BUTTON_CHANNEL = 1
 SNAKE_CHANNEL = 2
 FOOD_CHANNEL = 3
+# the volume of every sound category (channel) against the volume bar
+SOUND_VOLUMES: Dict[int, float] = {TEMP_MSG_CHANNEL: 1, BUTTON_CHANNEL: 1, SNAKE_CHANNEL: 1, FOOD_CHANNEL: 1}
 
 DEFAULT_BLOCK_SIZE = 19
+
+DIRTY_RECTS_LIMIT = 2048
@@ -25,3 +25,8 @@ class SettingsChanged(Error):
 
 class LoginError(Error):
     """Raised when the user login details are wrong"""
+
+
+class BoardFull(UserDsq):
+    """Raised when there is no free cell left to place the food on"""
+    pass
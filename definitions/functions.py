@@ -1,4 +1,6 @@
 from .constants import *
+import os
+import re
 import keyboard
 import win32api
 import win32con
@@ -22,6 +24,21 @@ def distance(obj1, obj2) -> float:
     return ((x1 - x2) ** 2 + (y1 - y2) ** 2) ** 0.5
 
 
+def new_seed() -> int:
+    """
+    :return: a new random seed for a game
+    """
+    return int.from_bytes(os.urandom(4), 'little')
+
+
+def asset_path(path: str) -> str:
+    """
+    :param path: a path of the project files, written with '\\' or '/'
+    :return: the path on this system, from the project folder
+    """
+    return os.path.join(ROOT_FOLDER, *re.split(r'[\\/]', path))
+
+
 def next_pos(start_pos: POSITION, change: POSITION):
     x, y = start_pos
     c_x, c_y = change
@@ -31,12 +48,6 @@ def next_pos(start_pos: POSITION, change: POSITION):
         y += c_y
 
 
-def play_sound(channel_number: int, sound_file: str, volume: float):
-    channel = pygame.mixer.Channel(channel_number)
-    channel.set_volume(volume)
-    channel.play(pygame.mixer.Sound(sound_file))
-
-
 def get_caps_lock_status():
     status = win32api.GetKeyState(win32con.VK_CAPITAL)
     if status == -127 or status == 1:
@@ -86,11 +86,10 @@ class Button(Message):
         self._description = Message((0, 0), description, size, RED, TOPLEFT)
         self._played_sound = False
         self._base_color = color
-        self._volume = data.volume
 
     def _play_sound(self):
         super(Button, self)._play_sound()
-        play_sound(BUTTON_CHANNEL, BUTTON_SOUND, self._volume.value)
+        play_sound(BUTTON_CHANNEL, BUTTON_SOUND)
 
     def draw(self, screen: pygame.Surface):
         if self.is_touch_mouse():
@@ -246,12 +245,11 @@ class ScaleBar:
 class SelectionButton(Message):
     def __init__(self, pos: POSITION, text: str, mode: bool, size: int, data: DataManager, position_at: str = TOPLEFT):
         self._mode = mode
-        self._volume = data.volume
         super(SelectionButton, self).__init__(pos, text, size, GREEN if self._mode else RED, position_at)
 
     def _play_sound(self):
         super(SelectionButton, self)._play_sound()
-        play_sound(BUTTON_CHANNEL, BUTTON_SOUND, self._volume.value)
+        play_sound(BUTTON_CHANNEL, BUTTON_SOUND)
 
     def change_mode(self):
         self._mode = not self._mode
@@ -267,12 +265,11 @@ class ColorSelector(Message):
                  allow_black=False):
         self._color_index = COLORS.index(color)
         self._allow_black = allow_black
-        self._volume = data.volume
         super(ColorSelector, self).__init__(pos, text, size, color, position_at)
 
     def _play_sound(self):
         super(ColorSelector, self)._play_sound()
-        play_sound(BUTTON_CHANNEL, BUTTON_SOUND, self._volume.value)
+        play_sound(BUTTON_CHANNEL, BUTTON_SOUND)
 
     def change_color(self, forward=True):
         delta = 1 if forward else -1
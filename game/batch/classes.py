@@ -0,0 +1,192 @@
+from settings import *
+from .constants import *
+
+
+class BatchSimulation:
+    """
+    runs many independent classic (or survival) games in lockstep with NumPy arrays.
+    one step is one snake movement (MOVEMENT_COUNTER frames) of every running game, and follows the rules of
+    Snake, SurvivalSnake and Food: the body is a queue of cells (with the growth duplicates), a tail cell is freed
+    only at the end of the movement, and the food is a random free cell
+    """
+    def __init__(self, size: POSITION, games: int, survival: bool = False, seed=None):
+        width, height = size
+        self._width, total_height = width // settings.snake_speed, height // settings.snake_speed
+        self._height = int(total_height - total_height * DATA_ZONE_SIZE)
+        self._games = games
+        self._survival = survival
+        self._teleport = settings.teleport
+        self._rng = np.random.default_rng(seed)
+        players = 2 if survival else 1
+        start_x, start_y = round_to_grid((self._width * settings.snake_speed // (players + 1) * players,
+                                          total_height * settings.snake_speed // 2))
+        self._start = start_x // settings.snake_speed * self._height + start_y // settings.snake_speed
+        self._timer_delta = SURVIVAL_TIMER * MOVEMENT_COUNTER * self._width * self._height / 1792
+        cells = self._width * self._height
+        self._capacity = 2 * cells + STARTER_SIZE
+        self._board = np.zeros((games, cells), dtype=np.int8)
+        self._head = np.zeros(games, dtype=np.int32)
+        self._direction = np.zeros(games, dtype=np.int8)
+        self._food = np.zeros(games, dtype=np.int32)
+        self._body = np.zeros((games, self._capacity), dtype=np.int32)
+        self._body_tail = np.zeros(games, dtype=np.int32)
+        self._body_length = np.zeros(games, dtype=np.int32)
+        self._body_pos = np.zeros(games, dtype=np.int32)
+        self._current_block = np.zeros(games, dtype=np.int32)
+        self._last_block = np.zeros(games, dtype=np.int32)
+        self._timer = np.zeros(games, dtype=np.float64)
+        self._done = np.zeros(games, dtype=bool)
+        self._ticks = 0
+        self.reset()
+
+    @property
+    def games(self):
+        return self._games
+
+    @property
+    def shape(self):
+        return self._width, self._height
+
+    @property
+    def board(self):
+        """
+        :return: the (games, width, height) board, BATCH_EMPTY / BATCH_SNAKE / BATCH_FOOD per cell
+        """
+        return self._board.reshape(self._games, self._width, self._height)
+
+    @property
+    def heads(self):
+        return np.stack(np.divmod(self._head, self._height), axis=1)
+
+    @property
+    def foods(self):
+        return np.stack(np.divmod(self._food, self._height), axis=1)
+
+    @property
+    def directions(self):
+        return self._direction
+
+    @property
+    def lengths(self):
+        return self._body_length + 1
+
+    @property
+    def done(self):
+        return self._done
+
+    @property
+    def ticks(self):
+        """
+        :return: the number of game frames simulated so far, over all the games
+        """
+        return self._ticks
+
+    def _push(self, games, cells):
+        index = (self._body_tail[games] + self._body_length[games]) % self._capacity
+        self._body[games, index] = cells
+        self._body_length[games] += 1
+        self._body_pos[games] = cells
+
+    def _pop(self, games):
+        cells = self._body[games, self._body_tail[games]]
+        self._body_tail[games] = (self._body_tail[games] + 1) % self._capacity
+        self._body_length[games] -= 1
+        return cells
+
+    def _place_food(self, games):
+        """
+        move the food of the given games to a random free cell, end the games with a full board
+        """
+        free = self._board[games] == BATCH_EMPTY
+        keys = self._rng.random(free.shape)
+        keys[~free] = -1
+        cells = np.argmax(keys, axis=1).astype(np.int32)
+        full = ~free.any(axis=1)
+        self._done[games[full]] = True
+        games, cells = games[~full], cells[~full]
+        old = self._food[games]
+        is_food = self._board[games, old] == BATCH_FOOD
+        self._board[games[is_food], old[is_food]] = BATCH_EMPTY
+        self._food[games] = cells
+        self._board[games, cells] = BATCH_FOOD
+
+    def set_food(self, games, cells):
+        """
+        put the food of the given games on the given (x, y) cells, instead of the random ones
+        """
+        games = np.atleast_1d(np.asarray(games))
+        x, y = np.atleast_2d(np.asarray(cells)).T
+        old = self._food[games]
+        is_food = self._board[games, old] == BATCH_FOOD
+        self._board[games[is_food], old[is_food]] = BATCH_EMPTY
+        self._food[games] = x * self._height + y
+        self._board[games, self._food[games]] = BATCH_FOOD
+
+    def reset(self, games=None):
+        """
+        restart the given games (all of them by default), like Simulation.reset
+        """
+        games = np.arange(self._games) if games is None else np.flatnonzero(games)
+        if len(games) == 0:
+            return
+        self._board[games] = BATCH_EMPTY
+        self._head[games] = self._start
+        self._board[games, self._start] = BATCH_SNAKE
+        self._direction[games] = DIR_UP
+        self._body_tail[games] = 0
+        self._body_length[games] = STARTER_SIZE - 1
+        self._body[games, :STARTER_SIZE - 1] = -1
+        self._body_pos[games] = -1
+        self._current_block[games] = -1
+        self._last_block[games] = -1
+        self._timer[games] = 0
+        self._done[games] = False
+        self._place_food(games)
+
+    def step(self, directions=None):
+        """
+        move every running game by one block
+        :param directions: the requested direction of every game (DIR_*), NO_DIRECTION to keep going
+        :return: the games that ended in this step
+        """
+        games = np.flatnonzero(~self._done)
+        if directions is not None:
+            requested = np.asarray(directions, dtype=np.int8)[games]
+            turn = (requested != NO_DIRECTION) & (requested // 2 != self._direction[games] // 2)
+            self._direction[games[turn]] = requested[turn]
+        direction = self._direction[games]
+        x, y = np.divmod(self._head[games], self._height)
+        x = x + DIRECTION_DX[direction]
+        y = y + DIRECTION_DY[direction]
+        if self._teleport:
+            x %= self._width
+            y %= self._height
+            inside = np.ones(len(games), dtype=bool)
+        else:
+            inside = (0 <= x) & (x < self._width) & (0 <= y) & (y < self._height)
+        cells = np.where(inside, x * self._height + y, 0)
+        ate = inside & (cells == self._food[games])
+        if self._survival:
+            self._timer[games[ate]] -= self._timer_delta
+        else:
+            self._push(games[ate], self._body_pos[games[ate]])
+        self._place_food(games[ate])
+        dsq = ~ate & (~inside | (self._board[games, cells] != BATCH_EMPTY))
+        self._board[games[inside], cells[inside]] = BATCH_SNAKE
+        self._push(games, self._head[games])
+        self._head[games[inside]] = cells[inside]
+        self._last_block[games] = self._current_block[games]
+        self._current_block[games] = self._pop(games)
+        if self._survival:
+            for _ in range(MOVEMENT_COUNTER):
+                self._timer[games] += 1
+                grow = games[self._timer[games] >= self._timer_delta]
+                self._push(grow, self._body_pos[grow])
+                self._timer[grow] -= self._timer_delta
+        last = self._last_block[games]
+        release = (last != self._current_block[games]) & (last != -1)
+        self._board[games[release], last[release]] = BATCH_EMPTY
+        self._done[games[dsq]] = True
+        self._done[games[self._body_length[games] >= self._capacity - MOVEMENT_COUNTER - 1]] = True
+        self._ticks += len(games) * MOVEMENT_COUNTER
+        return games[self._done[games]]
@@ -0,0 +1,10 @@
+import numpy as np
+from ..snake.constants import *
+
+BATCH_EMPTY: int = 0
+BATCH_SNAKE: int = 1
+BATCH_FOOD: int = 2
+
+NO_DIRECTION: int = -1
+DIRECTION_DX = np.array([0, 0, -1, 1], dtype=np.int32)     # DIR_UP, DIR_DOWN, DIR_LEFT, DIR_RIGHT
+DIRECTION_DY = np.array([-1, 1, 0, 0], dtype=np.int32)
@@ -1,75 +1,8 @@
 from .snake import *
 from .food import *
-
-
-class Obstacle(GameBlock):
-    def __init__(self, snake: Snake, data_zone: BlockObject, screen: pygame.Surface):
-        super(Obstacle, self).__init__((0, 0), (settings.block_size, settings.block_size), RED)
-        self._direction = 0
-        self._under_me = None
-        self._snake_pointer = snake
-        self._speed = settings.obstacle_speed // MOVEMENT_COUNTER
-        self._super_mode = False
-        self.start(screen, data_zone)
-
-    def reset_pos(self, screen: pygame.Surface, data_zone):
-        num = random.randint(0, 3)
-        w = screen.get_rect().width - settings.block_size - 1
-        h = screen.get_rect().height - data_zone.rect.height - settings.block_size
-        if num == 0:
-            pos = (random.randint(0, w), 0)
-        elif num == 1:
-            pos = (w, random.randint(0, h))
-        elif num == 2:
-            pos = (random.randint(0, w), h)
-        else:
-            pos = (0, random.randint(0, h))
-        self._pos = pos
-
-    def start(self, screen: pygame.Surface, data_zone):
-        self.reset_pos(screen, data_zone)
-        while self._is_dead(screen, data_zone):
-            self.reset_pos(screen, data_zone)
-        self.redirect()
-        self._super_mode = False
-        self._color = RED
-
-    def redirect(self):
-        x, y = self._pos
-        snake_x, snake_y = self._snake_pointer.rect.center
-        self._direction = math.atan2(y - snake_y, x - snake_x)
-
-    def _is_dead(self, screen: pygame.Surface, data_zone):
-        head = self.rect
-        if self.is_touch(data_zone):
-            return True
-        poses = [head.topleft, head.topright, head.bottomleft, head.bottomright]
-        try:
-            for pos in poses:
-                if screen.get_at(pos)[:-1] not in [settings.food_color, settings.background_color]:
-                    return True
-            return False
-        except IndexError:
-            return True
-
-    def check_food(self, screen, food: Food):
-        if self.is_touch(food):
-            food.replace(screen)
-            self._super_mode = True
-            self._color = PURPLE
-
-    def update(self, screen, food, data_zone):
-        if self._super_mode:
-            self.redirect()
-        self.delete(screen)
-        x, y = self._pos
-        x -= math.cos(self._direction) * self._speed
-        y -= math.sin(self._direction) * self._speed
-        self._pos = (x, y)
-        if self._is_dead(screen, data_zone):
-            self.start(screen, data_zone)
-        self.check_food(screen, food)
-        self.draw(screen)
+from .batch import *
+from .replay import *
+from .obstacles import *
 
 
 class Timer:
@@ -95,29 +28,44 @@ class Timer:
 
 
 class DataZone(BlockObject):
-    def __init__(self, screen: pygame.Surface, data, snakes: List[Snake]):
+    def __init__(self, screen: pygame.Surface, data, simulation):
         x, y = screen_grids(screen)
         y = int(y - y * DATA_ZONE_SIZE) * settings.snake_speed
         w, h = screen.get_size()
         super(DataZone, self).__init__((0, y), (w, h - y), WHITE)
+        snakes = simulation.snakes
         self._snakes = snakes
         self._pause = True
         self._pause_msg = Message(self.rect.center, 'game paused!, click space to continue', settings.text_size, BLACK,
                                   CENTER)
         self._pos_gen = self.pos_generator()
         self._switcher = Switcher(self.text_pos, data)
-        self._timer = Timer()
+        self._timer = simulation.timer
         self._msgs = [DataMessage(self.text_pos, 'score p{}: {}', settings.text_size, BLACK, value=snake,
                                   func=lambda s: (s.index+1, len(s))) for snake in snakes]
         self._msgs.append(DataMessage(self.text_pos, 'timer: {}', settings.text_size, BLACK, value=self._timer,
                                       func=lambda t: str(t)))
+        self._msgs.append(DataMessage(self.text_pos, 'seed: {}', settings.text_size, BLACK, value=simulation,
+                                      func=lambda s: s.seed))
+        self._drawn_state = None
         self.draw(screen)
 
     @property
     def pause(self):
         return self._pause
 
+    @pause.setter
+    def pause(self, pause):
+        self._pause = pause
+
+    @property
+    def _state(self):
+        return self._pause, bool(self._switcher), self._switcher.is_touch_mouse(), [msg.text for msg in self._msgs]
+
     def draw(self, screen):
+        """
+        draw the whole zone (the volume bar is drawn on it), but send it to the window only when its texts change
+        """
         super(DataZone, self).draw(screen)
         self._switcher.draw(screen)
         if self._switcher:
@@ -125,8 +73,10 @@ class DataZone(BlockObject):
                 msg.draw(screen)
         if self._pause:
             self._pause_msg.draw(screen)
-        else:
-            self._timer.update()
+        state = self._state
+        if state != self._drawn_state:
+            dirty_rects.add(self.rect)
+            self._drawn_state = state
 
     def pos_generator(self):
         x, y = self._pos
@@ -150,13 +100,188 @@ class DataZone(BlockObject):
 
     def reset(self, screen):
         self._pause = True
+        self._drawn_state = None
         self.draw(screen)
-        self._timer.reset()
+
+
+class Simulation:
+    """
+    the game logic of a game mode (classic by default), without any window.
+    step advances the game by one frame, the rendering (draw_simulation) only reads the state
+    """
+    name = 'classic'
+
+    def __init__(self, size: POSITION, seed: int = None):
+        """
+        :param seed: the seed of the random numbers of the first game (default: a new random seed)
+        """
+        self._seed = None
+        self._random = random.Random()
+        self._grid = OccupancyGrid(size)
+        self._timer = Timer()
+        self._boundary = None
+        self._create_board()
+        self._snakes: List[Snake] = self._create_snakes()
+        self._foods: List[Food] = self._create_foods()
+        self._obstacles: ObstacleField = self._create_obstacles()
+        self.reset(seed)
+
+    def _create_board(self):
+        pass
+
+    def _create_snakes(self):
+        return [Snake(self._grid)]
+
+    def _create_foods(self):
+        return [Food(self._grid, self._random)]
+
+    def _create_obstacles(self):
+        return ObstacleField(self._grid, self._random)
+
+    @property
+    def seed(self):
+        return self._seed
+
+    @property
+    def grid(self):
+        return self._grid
+
+    @property
+    def snakes(self):
+        return self._snakes
+
+    @property
+    def foods(self):
+        return self._foods
+
+    @property
+    def obstacles(self):
+        return self._obstacles
+
+    @property
+    def boundary(self):
+        return self._boundary
 
     @property
     def timer(self):
-        return self._timer.value
+        return self._timer
 
     @property
-    def timer_str(self):
-        return str(self._timer)
+    def score(self):
+        return sum([len(snake) for snake in self._snakes])
+
+    @property
+    def winner(self):
+        return max(self._snakes, key=lambda s: (not s.dsq, len(s))).index
+
+    def food_of(self, snake: Snake):
+        return self._foods[snake.index % len(self._foods)]
+
+    def step(self, inputs: Iterable[Tuple[int, int]] = ()):
+        """
+        advance the game by one frame
+        :param inputs: the (snake index, pressed key) pairs of this frame
+        :return: None, raise UserDsq when the game is over
+        """
+        for index, key in inputs:
+            self._snakes[index].set_direction(key)
+        self._update()
+        self._timer.update()
+
+    def _update(self):
+        dsq = False
+        for snake in self._snakes:
+            dsq = snake.step(self.food_of(snake)) or dsq
+        if dsq:
+            raise UserDsq
+
+    def reset(self, seed: int = None):
+        """
+        start a new game, every game gets its own random seed unless one is given
+        """
+        self._seed = new_seed() if seed is None else seed
+        self._random.seed(self._seed)
+        self._grid.reset()
+        for snake in self._snakes:
+            snake.reset()
+        for food in self._foods:
+            food.reset()
+        self._obstacles.reset()
+        self._timer.reset()
+
+
+class ObstaclesSimulation(Simulation):
+    name = 'obstacles'
+
+    def _start_obstacles(self):
+        self._obstacle_counter = 0
+        self.add_obstacle()
+
+    def add_obstacle(self):
+        self._obstacles.spawn(self._snakes[0].rect.center)
+
+    def _update_obstacles(self):
+        self._obstacles.step(self._snakes[0].rect.center, self._foods[0])
+
+    def _update(self):
+        super(ObstaclesSimulation, self)._update()
+        self._update_obstacles()
+        self._obstacle_counter += 1
+        if self._obstacle_counter >= 60 * MOVEMENT_COUNTER:
+            self.add_obstacle()
+            self._obstacle_counter = 0
+
+    def reset(self, seed: int = None):
+        super(ObstaclesSimulation, self).reset(seed)
+        self._start_obstacles()
+
+
+class CoopSimulation(Simulation):
+    name = 'cooperation'
+
+    def _create_snakes(self):
+        return [Snake(self._grid, index, 2) for index in range(2)]
+
+
+class SurvivalSimulation(Simulation):
+    name = 'survival'
+
+    def _create_snakes(self):
+        return [SurvivalSnake(self._grid)]
+
+
+class BattleSimulation(Simulation):
+    name = 'battle'
+    snake_class = BattleSnake
+    time_limit = BATTLE_TIMER
+
+    def _create_board(self):
+        width, height = self._grid.size
+        line_rect = pygame.Rect(0, 0, settings.snake_speed * 2 - 1 if self._grid.width % 2 == 0 else
+                                settings.block_size, height)
+        line_rect.center = (width // 2, height // 2)
+        line_rect.topleft = round_to_grid(line_rect.topleft)
+        self._boundary = line_rect
+        self._grid.fill_rect(line_rect, GRID_BOUNDARY)
+
+    def _create_snakes(self):
+        return [self.snake_class(self._grid, self._boundary, index, 2) for index in range(2)]
+
+    def _create_foods(self):
+        return [BattleFood(self._grid, self._random, index) for index in range(2)]
+
+    def _update(self):
+        super(BattleSimulation, self)._update()
+        if self.time_limit is not None and self._timer.value > self.time_limit * settings.refresh_rate:
+            raise UserDsq
+
+
+class SurvivalBattleSimulation(BattleSimulation):
+    name = 'survival battle'
+    snake_class = SurvivalBattleSnake
+    time_limit = None
+
+
+GAME_MODES: Dict[str, Type[Simulation]] = {mode.name: mode for mode in [Simulation, ObstaclesSimulation,
+                                                                      CoopSimulation, SurvivalSimulation,
+                                                                      BattleSimulation, SurvivalBattleSimulation]}
@@ -1,68 +1,41 @@
 import random
 from settings import *
+from ..grid import *
 
 
 class Food(GameBlock):
-    def __init__(self, screen: pygame.Surface):
+    def __init__(self, grid: OccupancyGrid, rng: random.Random):
         super(Food, self).__init__((0, 0), (settings.block_size, settings.block_size), settings.food_color)
-        self.gen_pos(screen)
-        self.draw(screen)
+        self._grid = grid
+        self._random = rng
+        self._free_cells = self._region()
+        self.gen_pos()
 
-    def _pos_ok(self, screen: pygame.Surface, last_pos):
-        head = self.rect
-        if last_pos == self._pos:
-            return False
-        try:
-            top_left = screen.get_at(head.topleft)[:-1]
-            top_right = screen.get_at(head.topright)[:-1]
-            bottom_left = screen.get_at(head.bottomleft)[:-1]
-            bottom_right = screen.get_at(head.bottomright)[:-1]
-            return [top_left, top_right, bottom_left, bottom_right].count(settings.background_color) == 4
-        except IndexError:
-            return False
+    def _region(self):
+        return self._grid.region()
 
-    def gen_pos(self, screen: pygame.Surface):
-        width, height = screen_grids(screen)
-        height = int(height - height * DATA_ZONE_SIZE - 1)
-        last_pos = self._pos
-        self._pos = (random.randint(0, width) * settings.snake_speed, random.randint(0, height) * settings.snake_speed)
-        while not self._pos_ok(screen, last_pos):
-            self._pos = (random.randint(0, width) * settings.snake_speed,
-                         random.randint(0, height) * settings.snake_speed)
+    def gen_pos(self):
+        cell = self._grid.pick(self._free_cells, self._random)
+        if cell is None:
+            raise BoardFull
+        self._grid.release(self._pos, GRID_FOOD)
+        self._pos = self._grid.pos(cell)
+        self._grid.occupy(self._pos, GRID_FOOD)
 
-    def reset(self, screen):
-        self.gen_pos(screen)
-        self.draw(screen)
+    def reset(self):
+        self.gen_pos()
 
-    def replace(self, screen):
-        self.delete(screen)
-        self.gen_pos(screen)
-        self.draw(screen)
+    def replace(self):
+        self.gen_pos()
 
 
 class BattleFood(Food):
-    def __init__(self, screen, boundary_line: pygame.Rect, index):
+    def __init__(self, grid: OccupancyGrid, rng: random.Random, index):
         self._index = index
-        self._boundary_line = boundary_line
-        super(BattleFood, self).__init__(screen)
+        super(BattleFood, self).__init__(grid, rng)
 
-    def _pos_ok(self, screen: pygame.Surface, last_pos):
-        return super(BattleFood, self)._pos_ok(screen, last_pos) and not self.rect.colliderect(self._boundary_line)
-
-    def gen_pos(self, screen: pygame.Surface):
-        width, height = screen_grids(screen)
-        height = int(height - height * DATA_ZONE_SIZE - 1)
-        last_pos = self._pos
+    def _region(self):
+        width = self._grid.width
         if self._index == 0:
-            w_rnd = random.randint(width // 2, width) * settings.snake_speed
-        else:
-            w_rnd = random.randint(0, width // 2) * settings.snake_speed
-        h_rnd = random.randint(0, height) * settings.snake_speed
-        self._pos = (w_rnd, h_rnd)
-        while not self._pos_ok(screen, last_pos):
-            if self._index == 0:
-                w_rnd = random.randint(width // 2, width) * settings.snake_speed
-            else:
-                w_rnd = random.randint(0, width // 2) * settings.snake_speed
-            h_rnd = random.randint(0, height) * settings.snake_speed
-            self._pos = (w_rnd, h_rnd)
+            return self._grid.region(width // 2, width)
+        return self._grid.region(0, width // 2 + 1)
@@ -1,9 +1,13 @@
 from .classes import *
 
 
-def reset_game(screen: pygame.Surface, data: DataManager, snakes: List[Snake], foods: List[Food], data_zone: DataZone):
-    restart_button = Button(screen.get_rect().center, 'game over! restart here', RED, 'click here to restart game',
+def reset_game(screen: pygame.Surface, data: DataManager, simulation: Simulation, data_zone: DataZone,
+               replay: Replay):
+    x, y = screen.get_rect().center
+    restart_button = Button((x, y), 'game over! restart here', RED, 'click here to restart game',
                             settings.text_size, data, CENTER)
+    replay_button = Button((x, y + settings.text_size * 2), 'watch replay', RED, 'watch the game again',
+                           settings.text_size, data, CENTER)
     restart = False
     data.delete(screen)
     while data.running and not restart:
@@ -17,24 +21,30 @@ def reset_game(screen: pygame.Surface, data: DataManager, snakes: List[Snake], f
                 if event.button == MOUSE_LEFT:
                     if restart_button.is_touch_mouse():
                         restart = True
+                    elif replay_button.is_touch_mouse():
+                        try:
+                            watch_replay(screen, data, replay)
+                        except EscPressed:
+                            pass
+                        data.delete(screen)
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     raise EscPressed
         restart_button.draw(screen)
+        replay_button.draw(screen)
         data.draw(screen)
         pygame.display.flip()
         clock.tick(LOBBY_REFRESH_RATE)
         data.delete(screen)
     screen.fill(settings.background_color)
-    for snake in snakes:
-        snake.reset(screen)
-    for food in foods:
-        food.reset(screen)
+    simulation.reset()
     data_zone.reset(screen)
     data.empty()
+    dirty_rects.full()
 
 
 def check_game_events(data: DataManager, data_zone: DataZone, snakes: List[Snake]):
+    inputs = []
     events = pygame.event.get()
     data.handle_events(events)
     data_zone.handle_events(events)
@@ -44,153 +54,141 @@ def check_game_events(data: DataManager, data_zone: DataZone, snakes: List[Snake
             raise QuitPressed
         elif event.type == pygame.KEYDOWN:
             if event.key in [pygame.K_UP, pygame.K_DOWN, pygame.K_RIGHT, pygame.K_LEFT] and not data_zone.pause:
-                snakes[0].set_direction(event.key)
+                inputs.append((0, event.key))
             elif event.key in [pygame.K_w, pygame.K_s, pygame.K_d, pygame.K_a] and not data_zone.pause:
-                snakes[len(snakes) - 1].set_direction(event.key)
+                inputs.append((len(snakes) - 1, event.key))
             elif event.key == pygame.K_ESCAPE:
                 raise EscPressed
+        elif event.type in [pygame.VIDEORESIZE, pygame.VIDEOEXPOSE]:
+            dirty_rects.full()
+    return inputs
 
 
-def update_game(screen: pygame.Surface, data_zone: DataZone, snakes: List[Snake], foods: List[Food]):
-    if not data_zone.pause:
-        dsq = False
-        for i, snake in enumerate(snakes):
-            dsq = snake.update(screen, foods[i], data_zone) or dsq
-        if dsq:
-            raise UserDsq
-
-
-def update_obstacles(screen: pygame.Surface, data_zone: DataZone, food: Food, snakes: List[Snake],
-                     obstacles: List[Obstacle], obstacle_counter: int):
-    if not data_zone.pause:
-        for obstacle in obstacles:
-            obstacle.update(screen, food, data_zone)
-        obstacle_counter += 1
-        if obstacle_counter >= 60 * MOVEMENT_COUNTER:
-            obstacles.append(Obstacle(snakes[0], data_zone, screen))
-            obstacle_counter = 0
-    return obstacle_counter
+def draw_simulation(screen: pygame.Surface, data: DataManager, simulation: Simulation):
+    for food in simulation.foods:
+        food.draw(screen)
+    for snake in simulation.snakes:
+        snake.draw(screen, simulation.food_of(snake))
+    simulation.obstacles.draw(screen)
+    if simulation.boundary is not None:
+        pygame.draw.rect(screen, RED, simulation.boundary)
 
 
 def draw_game(screen: pygame.Surface, data: DataManager, data_zone: DataZone):
     data_zone.draw(screen)
     data.draw(screen)
-    pygame.display.flip()
+    dirty_rects.update()
     clock.tick(settings.refresh_rate)
 
 
-def get_battle_line(screen: pygame.Surface):
-    grid_x, _ = screen_grids(screen)
-    w, h = screen.get_size()
-    x, y = screen.get_rect().center
-    line_rect = pygame.Rect(0, 0, settings.snake_speed * 2 - 1 if grid_x % 2 == 0 else settings.block_size, h)
-    line_rect.center = (x, y)
-    line_rect.topleft = round_to_grid(line_rect.topleft)
-    return line_rect
+def start_replay(simulation: Simulation) -> Replay:
+    """
+    start recording the current game of the simulation, which must not have started yet
+    """
+    return Replay(simulation.name, simulation.seed, simulation.grid.size)
 
 
-def snake_classic(screen: pygame.Surface, data: DataManager):
-    screen.fill(settings.background_color)
-    snakes = [Snake(screen, data)]
-    food = Food(screen)
-    data_zone = DataZone(screen, data, snakes)
-    while data.running:
+def load_replay(replay: Replay) -> Simulation:
+    """
+    :return: the simulation of the replay at its first frame, the replay settings must already be set
+    """
+    return GAME_MODES[replay.mode](replay.size, replay.seed)
+
+
+def run_replay(replay: Replay) -> Simulation:
+    """
+    play the replay without a window, as fast as possible
+    :return: the simulation at the end of the game
+    """
+    params = settings.game_params
+    settings.set_game_params(replay.params)
+    try:
+        simulation = load_replay(replay)
         try:
-            while True:
-                check_game_events(data, data_zone, snakes)
-                update_game(screen, data_zone, snakes, [food])
-                draw_game(screen, data, data_zone)
+            for inputs in replay.frames():
+                simulation.step(inputs)
         except UserDsq:
-            data += f'total score: {sum([len(snake) for snake in snakes])}'
-            reset_game(screen, data, snakes, [food], data_zone)
+            pass
+        return simulation
+    finally:
+        settings.set_game_params(params)
+
+
+def watch_replay(screen: pygame.Surface, data: DataManager, replay: Replay, speed: float = 1):
+    """
+    draw the replay
+    :param speed: game frames per drawn frame, 1 is the real game speed
+    """
+    params = settings.game_params
+    settings.set_game_params(replay.params)
+    try:
+        simulation = load_replay(replay)
+        screen.fill(settings.background_color)
+        data_zone = DataZone(screen, data, simulation)
+        data_zone.pause = False
+        dirty_rects.full()
+        frames = replay.frames()
+        counter = 0
+        try:
+            for inputs in frames:
+                while counter < 1:
+                    check_game_events(data, data_zone, simulation.snakes)
+                    draw_game(screen, data, data_zone)
+                    if not data_zone.pause:
+                        counter += speed
+                counter -= 1
+                simulation.step(inputs)
+                draw_simulation(screen, data, simulation)
+        except UserDsq:
+            pass
+        draw_game(screen, data, data_zone)
+    finally:
+        settings.set_game_params(params)
 
 
-def snake_obstacles(screen: pygame.Surface, data: DataManager):
+def play_game(screen: pygame.Surface, data: DataManager, simulation: Simulation,
+              end_message: Callable[[Simulation], str]):
     screen.fill(settings.background_color)
-    snakes = [Snake(screen, data)]
-    food = Food(screen)
-    data_zone = DataZone(screen, data, snakes)
+    replay = start_replay(simulation)
+    data_zone = DataZone(screen, data, simulation)
+    dirty_rects.full()
     while data.running:
-        obstacle_counter = 0
-        obstacles = [Obstacle(snakes[0], data_zone, screen)]
         try:
             while True:
-                check_game_events(data, data_zone, snakes)
-                update_game(screen, data_zone, snakes, [food])
-                obstacle_counter = update_obstacles(screen, data_zone, food, snakes, obstacles, obstacle_counter)
+                inputs = check_game_events(data, data_zone, simulation.snakes)
+                if not data_zone.pause:
+                    replay.record(inputs)
+                    simulation.step(inputs)
+                draw_simulation(screen, data, simulation)
                 draw_game(screen, data, data_zone)
         except UserDsq:
-            data += f'total score: {sum([len(snake) for snake in snakes])}'
-            reset_game(screen, data, snakes, [food], data_zone)
+            replay.save()
+            data += end_message(simulation)
+            reset_game(screen, data, simulation, data_zone, replay)
+            replay = start_replay(simulation)
+
+
+def snake_classic(screen: pygame.Surface, data: DataManager):
+    play_game(screen, data, Simulation(screen.get_size()), lambda s: f'total score: {s.score}')
+
+
+def snake_obstacles(screen: pygame.Surface, data: DataManager):
+    play_game(screen, data, ObstaclesSimulation(screen.get_size()), lambda s: f'total score: {s.score}')
 
 
 def snake_battle(screen: pygame.Surface, data: DataManager):
-    screen.fill(settings.background_color)
-    line_rect = get_battle_line(screen)
-    snakes = [BattleSnake(screen, data, line_rect, index, 2) for index in range(2)]
-    foods = [BattleFood(screen, line_rect, index) for index in range(2)]
-    data_zone = DataZone(screen, data, snakes)
-    while data.running:
-        try:
-            while True:
-                check_game_events(data, data_zone, snakes)
-                update_game(screen, data_zone, snakes, foods)
-                if data_zone.timer > BATTLE_TIMER * settings.refresh_rate:
-                    raise UserDsq
-                pygame.draw.rect(screen, RED, line_rect)
-                draw_game(screen, data, data_zone)
-        except UserDsq:
-            winner_index = 1 + max(snakes, key=lambda s: (not s.dsq, len(s))).index
-            data += f'p{winner_index} win! total score: {sum([len(snake) for snake in snakes])}'
-            reset_game(screen, data, snakes, foods, data_zone)
+    play_game(screen, data, BattleSimulation(screen.get_size()),
+              lambda s: f'p{s.winner + 1} win! total score: {s.score}')
 
 
 def snake_coop(screen: pygame.Surface, data: DataManager):
-    screen.fill(settings.background_color)
-    snakes = [Snake(screen, data, index, 2) for index in range(2)]
-    food = Food(screen)
-    data_zone = DataZone(screen, data, snakes)
-    while data.running:
-        try:
-            while True:
-                check_game_events(data, data_zone, snakes)
-                update_game(screen, data_zone, snakes, [food, food])
-                draw_game(screen, data, data_zone)
-        except UserDsq:
-            data += f'total score: {sum([len(snake) for snake in snakes])}'
-            reset_game(screen, data, snakes, [food], data_zone)
+    play_game(screen, data, CoopSimulation(screen.get_size()), lambda s: f'total score: {s.score}')
 
 
 def snake_survival(screen: pygame.Surface, data: DataManager):
-    screen.fill(settings.background_color)
-    snakes = [SurvivalSnake(screen, data)]
-    food = Food(screen)
-    data_zone = DataZone(screen, data, snakes)
-    while data.running:
-        try:
-            while True:
-                check_game_events(data, data_zone, snakes)
-                update_game(screen, data_zone, snakes, [food])
-                draw_game(screen, data, data_zone)
-        except UserDsq:
-            data += f'total time: {data_zone.timer_str}'
-            reset_game(screen, data, snakes, [food], data_zone)
+    play_game(screen, data, SurvivalSimulation(screen.get_size()), lambda s: f'total time: {s.timer}')
 
 
 def snake_survival_battle(screen: pygame.Surface, data: DataManager):
-    screen.fill(settings.background_color)
-    line_rect = get_battle_line(screen)
-    snakes = [SurvivalBattleSnake(screen, data, line_rect, index, 2) for index in range(2)]
-    foods = [BattleFood(screen, line_rect, index) for index in range(2)]
-    data_zone = DataZone(screen, data, snakes)
-    while data.running:
-        try:
-            while True:
-                check_game_events(data, data_zone, snakes)
-                update_game(screen, data_zone, snakes, foods)
-                pygame.draw.rect(screen, RED, line_rect)
-                draw_game(screen, data, data_zone)
-        except UserDsq:
-            winner_index = 1 + max(snakes, key=lambda s: (not s.dsq, len(s))).index
-            data += f'p{winner_index} win! total time: {data_zone.timer_str}'
-            reset_game(screen, data, snakes, foods, data_zone)
+    play_game(screen, data, SurvivalBattleSimulation(screen.get_size()),
+              lambda s: f'p{s.winner + 1} win! total time: {s.timer}')
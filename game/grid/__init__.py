@@ -0,0 +1 @@
+from .classes import *
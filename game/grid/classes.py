@@ -0,0 +1,227 @@
+import random
+import numpy as np
+from settings import *
+from .constants import *
+
+
+class FreeCells:
+    """
+    the free cells (no snake, food or static zone) of one board region, kept as a dense array with a position map (swap-remove),
+    so add, remove and pick are all O(1) no matter how full the board is
+    """
+    def __init__(self, left, right, height):
+        self._left = left
+        self._right = right
+        self._height = height
+        size = max(right - left, 0) * height
+        self._cells = np.empty(size, dtype=np.int32)
+        self._where = np.full(size, -1, dtype=np.int32)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def covers(self, x, y):
+        return self._left <= x < self._right and 0 <= y < self._height
+
+    def add(self, x, y):
+        index = (x - self._left) * self._height + y
+        if self._where[index] == -1:
+            self._cells[self._count] = index
+            self._where[index] = self._count
+            self._count += 1
+
+    def remove(self, x, y):
+        index = (x - self._left) * self._height + y
+        slot = self._where[index]
+        if slot != -1:
+            self._count -= 1
+            last = self._cells[self._count]
+            self._cells[slot] = last
+            self._where[last] = slot
+            self._where[index] = -1
+
+    def clear(self):
+        self._where[self._cells[:self._count]] = -1
+        self._count = 0
+
+    def pick(self, rng: random.Random):
+        """
+        :param rng: the random numbers of the game
+        :return: a random free cell of the region, None if the region is full
+        """
+        if self._count == 0:
+            return None
+        index = int(self._cells[rng.randrange(self._count)])
+        return self._left + index // self._height, index % self._height
+
+    @property
+    def cells(self):
+        """
+        :return: the x and y arrays of the free cells
+        """
+        indices = self._cells[:self._count]
+        return self._left + indices // self._height, indices % self._height
+
+
+class OccupancyGrid:
+    """
+    the authoritative board state, one cell per grid block (cell -> owner/kind)
+    """
+    def __init__(self, size: POSITION):
+        width, height = size
+        self._width, self._height = width // settings.snake_speed, height // settings.snake_speed
+        self._play_height = int(self._height - self._height * DATA_ZONE_SIZE)
+        self._cells = np.full((self._width, self._height), GRID_EMPTY, dtype=np.int16)
+        self._cells[:, self._play_height:] = GRID_DATA_ZONE
+        self._obstacles = np.zeros((self._width, self._height), dtype=np.uint16)
+        self._regions: Dict[Tuple[int, int], FreeCells] = {}
+
+    @property
+    def width(self):
+        return self._width
+
+    @property
+    def height(self):
+        return self._height
+
+    @property
+    def play_height(self):
+        return self._play_height
+
+    @property
+    def size(self):
+        return self.pos((self._width, self._height))
+
+    @staticmethod
+    def cell(pos):
+        x, y = pos
+        return int(x) // settings.snake_speed, int(y) // settings.snake_speed
+
+    @staticmethod
+    def pos(cell):
+        x, y = cell
+        return x * settings.snake_speed, y * settings.snake_speed
+
+    def region(self, left=0, right=None):
+        """
+        the free cells index of the play area columns [left, right)
+        """
+        right = self._width if right is None else min(right, self._width)
+        if (left, right) not in self._regions:
+            free_cells = FreeCells(left, right, self._play_height)
+            self._fill_region(free_cells, left, right)
+            self._regions[(left, right)] = free_cells
+        return self._regions[(left, right)]
+
+    def _fill_region(self, free_cells: FreeCells, left, right):
+        free_cells.clear()
+        area = (slice(left, right), slice(0, self._play_height))
+        xs, ys = np.nonzero(self._cells[area] == GRID_EMPTY)
+        for x, y in zip((xs + left).tolist(), ys.tolist()):
+            free_cells.add(x, y)
+
+    def _update_regions(self, x, y):
+        is_free = self._cells[x, y] == GRID_EMPTY
+        for free_cells in self._regions.values():
+            if free_cells.covers(x, y):
+                if is_free:
+                    free_cells.add(x, y)
+                else:
+                    free_cells.remove(x, y)
+
+    def pick(self, free_cells: FreeCells, rng: random.Random):
+        """
+        a random cell of the region that is free and has no obstacle.
+        the regions do not follow the obstacles (they move every frame), so a cell under an obstacle is picked again
+        :return: the cell, None if there is no such cell
+        """
+        for _ in range(PICK_TRIES):
+            cell = free_cells.pick(rng)
+            if cell is None or self._obstacles[cell] == 0:
+                return cell
+        xs, ys = free_cells.cells
+        free = np.flatnonzero(self._obstacles[xs, ys] == 0)
+        if len(free) == 0:
+            return None
+        index = free[rng.randrange(len(free))]
+        return int(xs[index]), int(ys[index])
+
+    def _inside(self, x, y):
+        return 0 <= x < self._width and 0 <= y < self._height
+
+    def kind_at(self, pos):
+        x, y = self.cell(pos)
+        if not self._inside(x, y):
+            return GRID_OUTSIDE
+        kind = self._cells[x, y]
+        if kind == GRID_EMPTY and self._obstacles[x, y]:
+            return GRID_OBSTACLE
+        return int(kind)
+
+    def is_free(self, pos):
+        return self.kind_at(pos) == GRID_EMPTY
+
+    def occupy(self, pos, kind):
+        x, y = self.cell(pos)
+        if self._inside(x, y):
+            self._cells[x, y] = kind
+            self._update_regions(x, y)
+
+    def release(self, pos, kind):
+        """
+        empty the cell, only if it still belongs to the given kind
+        """
+        x, y = self.cell(pos)
+        if self._inside(x, y) and self._cells[x, y] == kind:
+            self._cells[x, y] = GRID_EMPTY
+            self._update_regions(x, y)
+
+    def _rect_slice(self, rect: pygame.Rect):
+        left, top = self.cell(rect.topleft)
+        right, bottom = self.cell((rect.right - 1, rect.bottom - 1))
+        left, top = max(left, 0), max(top, 0)
+        right, bottom = min(right + 1, self._width), min(bottom + 1, self._height)
+        return slice(left, max(left, right)), slice(top, max(top, bottom))
+
+    def _rect_cells(self, rect: pygame.Rect):
+        xs, ys = self._rect_slice(rect)
+        return [(x, y) for x in range(xs.start, xs.stop) for y in range(ys.start, ys.stop)]
+
+    def fill_rect(self, rect: pygame.Rect, kind):
+        self._cells[self._rect_slice(rect)] = kind
+        for x, y in self._rect_cells(rect):
+            self._update_regions(x, y)
+
+    def obstacle_fits(self, xs, ys):
+        """
+        :param xs: array of cell x
+        :param ys: array of cell y
+        :return: array, True for the cells an obstacle can enter (inside the play area, empty or food, no obstacle)
+        """
+        inside = (0 <= xs) & (xs < self._width) & (0 <= ys) & (ys < self._play_height)
+        xs, ys = np.where(inside, xs, 0), np.where(inside, ys, 0)
+        kinds = self._cells[xs, ys]
+        return inside & ((kinds == GRID_EMPTY) | (kinds == GRID_FOOD)) & (self._obstacles[xs, ys] == 0)
+
+    def obstacles_at(self, xs, ys):
+        return self._obstacles[xs, ys]
+
+    def add_obstacles(self, xs, ys):
+        """
+        add an obstacle to every given cell (a cell may repeat)
+        """
+        np.add.at(self._obstacles, (xs, ys), 1)
+
+    def remove_obstacles(self, xs, ys):
+        np.subtract.at(self._obstacles, (xs, ys), 1)
+
+    def reset(self):
+        """
+        remove every snake, food and obstacle, keep the static zones (data zone, battle boundary)
+        """
+        self._cells[self._cells >= GRID_FOOD] = GRID_EMPTY
+        self._obstacles[:] = 0
+        for (left, right), free_cells in self._regions.items():
+            self._fill_region(free_cells, left, right)
+
@@ -0,0 +1,9 @@
+GRID_OUTSIDE: int = -1
+GRID_EMPTY: int = 0
+GRID_DATA_ZONE: int = 1
+GRID_BOUNDARY: int = 2
+GRID_FOOD: int = 3
+GRID_OBSTACLE: int = 4
+GRID_SNAKE: int = 5
+
+PICK_TRIES: int = 8
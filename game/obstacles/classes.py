@@ -0,0 +1,216 @@
+import random
+import numpy as np
+from settings import *
+from ..grid import *
+from ..food import *
+from .constants import *
+
+
+class ObstacleField:
+    """
+    all the obstacles of a game, kept in NumPy arrays and moved, retargeted and checked in one vectorised step.
+    the arrays are a fixed pool of slots with a free list, so a game of any length allocates no new obstacles.
+    an obstacle takes the grid cells under its corners in the obstacles layer of the grid,
+    and is respawned on a random edge when it hits anything but food
+    """
+    def __init__(self, grid: OccupancyGrid, rng: random.Random, limit: int = OBSTACLES_LIMIT,
+                 max_age=OBSTACLE_MAX_AGE, despawn_off_screen: bool = OBSTACLE_DESPAWN_OFF_SCREEN):
+        """
+        :param limit: the number of slots, spawning a new obstacle when all of them are taken recycles the oldest
+        :param max_age: frames until an obstacle goes back to the pool (None - never)
+        :param despawn_off_screen: an obstacle that leaves the board goes back to the pool instead of respawning
+        """
+        self._grid = grid
+        self._random = rng
+        self._np_random = np.random.default_rng(0)
+        self._max_age = max_age
+        self._despawn_off_screen = despawn_off_screen
+        self._x = np.zeros(limit)
+        self._y = np.zeros(limit)
+        self._direction = np.zeros(limit)
+        self._speed = np.zeros(limit)
+        self._super_mode = np.zeros(limit, dtype=bool)
+        self._span = np.zeros((limit, 4), dtype=np.int32)    # left, top, right, bottom cells in the grid
+        self._age = np.zeros(limit, dtype=np.int64)
+        self._alive = np.zeros(limit, dtype=bool)
+        self._free: List[int] = []
+        self._drawn: List[POSITION] = []
+        self._tiles = None
+        self.reset()
+
+    def __len__(self):
+        return len(self._x) - len(self._free)
+
+    @property
+    def _active(self):
+        return np.flatnonzero(self._alive)
+
+    @property
+    def positions(self):
+        active = self._active
+        return np.stack([self._x[active], self._y[active]], axis=1)
+
+    def _spans(self, indices):
+        left = np.floor(self._x[indices]).astype(np.int32)
+        top = np.floor(self._y[indices]).astype(np.int32)
+        size = settings.block_size - 1
+        return np.stack([left, top, left + size, top + size], axis=1) // settings.snake_speed
+
+    @staticmethod
+    def _cells(spans):
+        """
+        :return: the (x, y) grid cells under the corners of the spans, and the span of every cell
+        """
+        left, top, right, bottom = spans.T
+        xs = np.stack([left, right, left, right], axis=1)
+        ys = np.stack([top, top, bottom, bottom], axis=1)
+        keep = np.ones(xs.shape, dtype=bool)
+        keep[:, 1] = keep[:, 3] = right != left
+        keep[:, 2] = bottom != top
+        keep[:, 3] &= keep[:, 2]
+        owners = np.broadcast_to(np.arange(len(spans))[:, None], xs.shape)
+        return xs[keep], ys[keep], owners[keep]
+
+    def _place(self, indices):
+        """
+        put the obstacles on the grid at their positions, an obstacle that does not fit is left out
+        :return: the obstacles that did not fit
+        """
+        spans = self._spans(indices)
+        xs, ys, owners = self._cells(spans)
+        failed = np.zeros(len(indices), dtype=bool)
+        np.logical_or.at(failed, owners, ~self._grid.obstacle_fits(xs, ys))
+        placed = ~failed[owners]
+        self._grid.add_obstacles(xs[placed], ys[placed])
+        # two obstacles that moved into the same cell together
+        crowded = np.zeros(len(xs), dtype=bool)
+        crowded[placed] = self._grid.obstacles_at(xs[placed], ys[placed]) > 1
+        if crowded.any():
+            failed[owners[crowded]] = True
+            removed = placed & failed[owners]
+            self._grid.remove_obstacles(xs[removed], ys[removed])
+        self._span[indices[~failed]] = spans[~failed]
+        return indices[failed]
+
+    def _respawn(self, indices, target: POSITION):
+        """
+        move the obstacles to random free places on the edges of the board (masked reassignment of the arrays),
+        an obstacle that finds no place goes back to the pool
+        """
+        started = indices
+        width = self._grid.width * settings.snake_speed - settings.block_size - 1
+        height = self._grid.play_height * settings.snake_speed - settings.block_size
+        for _ in range(OBSTACLE_RESPAWN_TRIES):
+            if len(indices) == 0:
+                break
+            side = self._np_random.integers(0, OBSTACLE_SIDES, len(indices))
+            along_x = self._np_random.integers(0, width + 1, len(indices))
+            along_y = self._np_random.integers(0, height + 1, len(indices))
+            self._x[indices] = np.select([side == 1, side == 3], [width, 0], along_x)
+            self._y[indices] = np.select([side == 0, side == 2], [0, height], along_y)
+            indices = self._place(indices)
+        self._release(indices)
+        self._super_mode[started] = False
+        self._age[started] = 0
+        self._redirect(started, target)
+
+    def _release(self, indices):
+        """
+        return the obstacles (that are not on the grid) to the pool
+        """
+        self._alive[indices] = False
+        self._free.extend(indices.tolist())
+
+    def despawn(self, indices):
+        xs, ys, _ = self._cells(self._span[indices])
+        self._grid.remove_obstacles(xs, ys)
+        self._release(indices)
+
+    def _redirect(self, indices, target: POSITION):
+        target_x, target_y = target
+        self._direction[indices] = np.arctan2(self._y[indices] - target_y, self._x[indices] - target_x)
+
+    def spawn(self, target: POSITION):
+        """
+        take an obstacle from the pool (the oldest one if the pool is empty) and put it on the edge of the board,
+        going to the target
+        """
+        if not self._free:
+            active = self._active
+            self.despawn(active[np.argmax(self._age[active])][None])
+        index = self._free.pop()
+        self._alive[index] = True
+        self._speed[index] = settings.obstacle_speed // MOVEMENT_COUNTER
+        self._respawn(np.array([index]), target)
+
+    def _check_food(self, food: Food, active):
+        food_x, food_y = food.pos
+        touch = ((np.abs(np.floor(self._x[active]) - food_x) < settings.block_size) &
+                 (np.abs(np.floor(self._y[active]) - food_y) < settings.block_size))
+        if touch.any():
+            food.replace()
+            self._super_mode[active[np.argmax(touch)]] = True
+
+    def _off_screen(self, indices):
+        left, top, right, bottom = self._spans(indices).T
+        return (left < 0) | (top < 0) | (right >= self._grid.width) | (bottom >= self._grid.play_height)
+
+    def step(self, target: POSITION, food: Food):
+        """
+        move all the obstacles, the obstacles in super mode chase the target (the snake)
+        """
+        active = self._active
+        if len(active) == 0:
+            return
+        self._age[active] += 1
+        if self._max_age is not None:
+            expired = self._age[active] > self._max_age
+            self.despawn(active[expired])
+            active = active[~expired]
+        chasing = active[self._super_mode[active]]
+        if len(chasing):
+            self._redirect(chasing, target)
+        self._x[active] -= np.cos(self._direction[active]) * self._speed[active]
+        self._y[active] -= np.sin(self._direction[active]) * self._speed[active]
+        # only an obstacle that moved to other cells can hit something, nothing else enters its cells and lives
+        moved = active[(self._spans(active) != self._span[active]).any(axis=1)]
+        if len(moved):
+            xs, ys, _ = self._cells(self._span[moved])
+            self._grid.remove_obstacles(xs, ys)
+            dead = self._place(moved)
+            if self._despawn_off_screen:
+                off_screen = self._off_screen(dead)
+                self._release(dead[off_screen])
+                dead = dead[~off_screen]
+            if len(dead):
+                self._respawn(dead, target)
+        self._check_food(food, self._active)
+
+    def _load_tiles(self):
+        self._tiles = []
+        for color in [settings.background_color, RED, PURPLE]:
+            tile = pygame.Surface((settings.block_size, settings.block_size))
+            tile.fill(color)
+            self._tiles.append(tile)
+
+    def draw(self, screen: pygame.Surface):
+        """
+        erase the obstacles of the last frame and draw them again, with one blits call each (much faster than fills)
+        """
+        if self._tiles is None:
+            self._load_tiles()
+        background, normal, chasing = self._tiles
+        dirty_rects.extend(screen.blits([(background, pos) for pos in self._drawn]))
+        active = self._active
+        self._drawn = list(zip(np.floor(self._x[active]).astype(int).tolist(),
+                               np.floor(self._y[active]).astype(int).tolist()))
+        dirty_rects.extend(screen.blits([(chasing if super_mode else normal, pos) for pos, super_mode in
+                                         zip(self._drawn, self._super_mode[active].tolist())]))
+
+    def reset(self):
+        """
+        return all the obstacles to the pool (the grid is reset by the simulation)
+        """
+        self._alive[:] = False
+        self._free = list(range(len(self._x) - 1, -1, -1))
+        self._np_random = np.random.default_rng(self._random.getrandbits(64))
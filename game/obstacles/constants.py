@@ -0,0 +1,7 @@
+from ..snake.constants import *
+
+OBSTACLES_LIMIT: int = 1024             # the size of the pool, a new obstacle beyond it recycles the oldest one
+OBSTACLE_MAX_AGE = None                 # frames until an obstacle goes back to the pool, None - forever
+OBSTACLE_DESPAWN_OFF_SCREEN = False     # an obstacle that leaves the board goes back to the pool instead of respawning
+OBSTACLE_RESPAWN_TRIES: int = 64        # an obstacle with no free place on the edges after that goes back to the pool
+OBSTACLE_SIDES: int = 4                 # top, right, bottom, left
@@ -0,0 +1,141 @@
+import os
+import time
+from settings import *
+from .constants import *
+
+
+class Replay:
+    """
+    a recorded game: the game mode, the random seed, the game settings and the keys pressed in every frame.
+    a key is kept as the number of frames since the last key and one byte (snake index and direction),
+    so a replay takes a few bytes per key press no matter how long the game is
+    """
+    def __init__(self, mode: str, seed: int, size: POSITION, params=None):
+        self._mode = mode
+        self._seed = seed
+        self._size = size
+        self._params = settings.game_params if params is None else tuple(params)
+        self._events = bytearray()
+        self._ticks = 0
+        self._last_tick = 0
+
+    @property
+    def mode(self):
+        return self._mode
+
+    @property
+    def seed(self):
+        return self._seed
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def params(self):
+        return self._params
+
+    @property
+    def ticks(self):
+        """
+        :return: the number of recorded frames
+        """
+        return self._ticks
+
+    def _write_varint(self, value):
+        while value >= 0x80:
+            self._events.append(value & 0x7f | 0x80)
+            value >>= 7
+        self._events.append(value)
+
+    def record(self, inputs: Iterable[Tuple[int, int]] = ()):
+        """
+        record one frame
+        :param inputs: the (snake index, pressed key) pairs given to Simulation.step
+        """
+        for index, key in inputs:
+            key = P2_CVT_KEYS.get(key, key)
+            if key in REPLAY_KEYS:
+                self._write_varint(self._ticks - self._last_tick)
+                self._events.append(index << 2 | REPLAY_KEYS.index(key))
+                self._last_tick = self._ticks
+        self._ticks += 1
+
+    def events(self):
+        """
+        :return: generator of the recorded (frame, snake index, key) events
+        """
+        tick, delta, shift = 0, 0, 0
+        events = iter(self._events)
+        for byte in events:
+            delta |= (byte & 0x7f) << shift
+            shift += 7
+            if byte & 0x80:
+                continue
+            tick += delta
+            value = next(events)
+            yield tick, value >> 2, REPLAY_KEYS[value & 3]
+            delta, shift = 0, 0
+
+    def frames(self):
+        """
+        :return: generator of the inputs of every recorded frame, ready for Simulation.step
+        """
+        events = self.events()
+        event = next(events, None)
+        for frame in range(self._ticks):
+            inputs = []
+            while event is not None and event[0] == frame:
+                inputs.append(event[1:])
+                event = next(events, None)
+            yield inputs
+
+    def dumps(self) -> bytes:
+        resolution, base_block_size, refresh_rate, teleport = self._params
+        width, height = self._size
+        return REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, REPLAY_MODES.index(self._mode), self._seed,
+                                  self._ticks, width, height, resolution, base_block_size, refresh_rate,
+                                  teleport) + bytes(self._events)
+
+    @staticmethod
+    def loads(content: bytes):
+        magic, version, mode, seed, ticks, width, height, *params = REPLAY_HEADER.unpack_from(content)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError('not a replay file')
+        replay = Replay(REPLAY_MODES[mode], seed, (width, height), params)
+        replay._events = bytearray(content[REPLAY_HEADER.size:])
+        replay._ticks = ticks
+        return replay
+
+    def save(self, file_name: str = None):
+        """
+        write the replay, by default to a new file in the replays folder
+        :return: the file name
+        """
+        folder = None
+        if file_name is None:
+            folder = asset_path(REPLAY_FOLDER)
+            os.makedirs(folder, exist_ok=True)
+            file_name = os.path.join(folder, f'{int(time.time())}_{self._seed:08x}{REPLAY_SUFFIX}')
+        with open(file_name, 'wb') as my_file:
+            my_file.write(self.dumps())
+        if folder is not None:
+            Replay.remove_old(folder)
+        return file_name
+
+    @staticmethod
+    def remove_old(folder: str, limit: int = REPLAYS_LIMIT):
+        """
+        delete the oldest replays of the folder, so only the newest limit replays are left
+        """
+        files = [os.path.join(folder, name) for name in os.listdir(folder) if name.endswith(REPLAY_SUFFIX)]
+        for file_name in sorted(files, key=os.path.getmtime)[:-limit]:
+            os.remove(file_name)
+
+    @staticmethod
+    def load(file_name: str):
+        with open(file_name, 'rb') as my_file:
+            return Replay.loads(my_file.read())
+
+    def __len__(self):
+        return len(self._events)
@@ -0,0 +1,12 @@
+import struct
+from definitions import *
+
+REPLAY_MAGIC = b'SNKR'
+REPLAY_VERSION = 1
+# magic, version, mode, seed, ticks, width, height, resolution, base block size, refresh rate, teleport
+REPLAY_HEADER = struct.Struct('<4sBBQIHHHHH?')
+REPLAY_MODES: List[str] = ['classic', 'obstacles', 'battle', 'cooperation', 'survival', 'survival battle']
+REPLAY_KEYS: List[int] = [pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT]
+REPLAY_FOLDER = r'replays'
+REPLAY_SUFFIX = r'.rpl'
+REPLAYS_LIMIT = 50    # the replays folder keeps the newest replays only
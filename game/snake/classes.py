@@ -1,7 +1,46 @@
 import pygame.draw
 from font import *
 from .constants import *
-from queue import Queue
+from ..grid import *
+import numpy as np
+
+
+class EyeAtlas:
+    """
+    the pre-rendered eyes of one eye radius: every pupil radius, with the pupil direction quantised to EYE_ANGLES
+    """
+    _atlases: Dict[int, 'EyeAtlas'] = {}
+
+    def __init__(self, radius):
+        self._radius = radius
+        self._pupils = range(EYE_MIN_PUPIL, max(int(radius * 0.8), EYE_MIN_PUPIL) + 1)
+        self._sprites = [[self._render(pupil, 2 * math.pi * index / EYE_ANGLES) for index in range(EYE_ANGLES)]
+                         for pupil in self._pupils]
+
+    @staticmethod
+    def get(radius):
+        if radius not in EyeAtlas._atlases:
+            EyeAtlas._atlases[radius] = EyeAtlas(radius)
+        return EyeAtlas._atlases[radius]
+
+    def _render(self, pupil, angle):
+        center = self._radius + 1
+        sprite = pygame.Surface((center * 2, center * 2))
+        sprite.fill(BLACK)
+        sprite.set_colorkey(BLACK)
+        pygame.draw.circle(sprite, WHITE, (center, center), self._radius)
+        pupil_pos = (round(math.cos(angle) * (self._radius - pupil) + center),
+                     round(math.sin(angle) * (self._radius - pupil) + center))
+        pygame.draw.circle(sprite, GREEN, pupil_pos, pupil)
+        return sprite
+
+    @property
+    def offset(self):
+        return self._radius + 1
+
+    def sprite(self, pupil, angle):
+        pupil = min(max(int(pupil), self._pupils.start), self._pupils.stop - 1) - self._pupils.start
+        return self._sprites[pupil][round(angle / (2 * math.pi) * EYE_ANGLES) % EYE_ANGLES]
 
 
 class Eye(CircleObject):
@@ -19,17 +58,12 @@ class Eye(CircleObject):
     def _eye_radius(self):
         return max(min(self._radius * (1 - self.distance / self._screen_radius)**5, self._radius*0.8), 3)
 
-    def _closest(self, pos):
-        x1, y1 = pos
-        x2, y2 = self.rect.center
-        angle = math.atan2((y1 - y2), (x1 - x2))
-        x = math.cos(angle) * (self._radius - self._eye_radius) + x2
-        y = math.sin(angle) * (self._radius - self._eye_radius) + y2
-        return round(x), round(y)
-
     def draw(self, screen):
-        super(Eye, self).draw(screen)
-        pygame.draw.circle(screen, GREEN, self._closest(self._target), self._eye_radius)
+        atlas = EyeAtlas.get(self._radius)
+        x, y = self.rect.center
+        target_x, target_y = self._target
+        sprite = atlas.sprite(self._eye_radius, math.atan2(target_y - y, target_x - x))
+        dirty_rects.add(screen.blit(sprite, (x - atlas.offset, y - atlas.offset)))
 
     @property
     def target(self):
@@ -70,24 +104,94 @@ class SnakeEyes:
         self._right_eye.draw(screen)
 
 
-class SnakeBody(ImageObject):
+class BodyBuffer:
+    """
+    ring buffer of the body blocks (x, y, direction), the oldest block (the tail) first
+    """
+    def __init__(self, capacity: int = BODY_BUFFER_SIZE):
+        self._x = np.empty(capacity, dtype=np.int32)
+        self._y = np.empty(capacity, dtype=np.int32)
+        self._direction = np.empty(capacity, dtype=np.int8)
+        self._tail = 0
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def _capacity(self):
+        return len(self._x)
+
+    def _grow(self):
+        order = (np.arange(self._length) + self._tail) % self._capacity
+        capacity = self._capacity * 2
+        for name in ['_x', '_y', '_direction']:
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._length] = old[order]
+            setattr(self, name, new)
+        self._tail = 0
+
+    def push(self, pos, direction):
+        if self._length == self._capacity:
+            self._grow()
+        index = (self._tail + self._length) % self._capacity
+        self._x[index], self._y[index] = pos
+        self._direction[index] = direction
+        self._length += 1
+
+    def pop(self):
+        index = self._tail
+        self._tail = (self._tail + 1) % self._capacity
+        self._length -= 1
+        return (int(self._x[index]), int(self._y[index])), int(self._direction[index])
+
+    def clear(self):
+        self._tail = 0
+        self._length = 0
+
+
+class SnakeBody:
     def __init__(self, snake, index):
         self._snake = snake
-        self._queue = Queue()
+        self._index = index
+        self._blocks = BodyBuffer()
         self._movement_counter = 0
-        super(SnakeBody, self).__init__((-100, -100), settings.body1_image if index == 0 else settings.body2_image,
-                                        settings.snake_size)
+        self._sub_step = 0
+        self._pos = (-100, -100)
+        self._image = None
+        self._tail_frames: Dict[Tuple[int, int], pygame.Surface] = {}
+        self._tail_key = None
         self._current_block = None
         self._last_block = None
-        self._tail_image = Clicker((0, 0), TAIL_IMAGE, 0, 0).copy_color(BLACK, settings.background_color)
         self.reset()
 
-    def draw(self, screen):
+    def _load_sprites(self):
+        self._image = settings.skin_atlas.body(self._index)
+
+    def _load_tail_frames(self):
+        """
+        the tail image of every (direction, movement sub-step), scaled and rotated once for the current block size
+        and background color
+        """
+        tail = Clicker((0, 0), TAIL_IMAGE, 0, 0).copy_color(BLACK, settings.background_color).image
+        movement_delta = cal_movement()
+        self._tail_frames = {}
+        for counter in range(MOVEMENT_COUNTER):
+            length = movement_delta
+            if counter == MOVEMENT_COUNTER - 1:
+                length = settings.block_size - movement_delta * counter
+            image = pygame.transform.scale(tail, (settings.block_size, length))
+            for direction, angle in HEAD_DIRECTIONS.items():
+                self._tail_frames[(direction, counter)] = pygame.transform.rotate(image, angle)
+        self._tail_key = (settings.block_size, settings.background_color)
+
+    def _fill(self, screen):
         (x, y), direction = self._pos, self.direction
         movement_delta = cal_movement()
-        pos_delta = movement_delta * self._movement_counter
-        if self._movement_counter == MOVEMENT_COUNTER - 1:
-            movement_delta = settings.block_size - movement_delta * self._movement_counter
+        pos_delta = movement_delta * self._sub_step
+        if self._sub_step == MOVEMENT_COUNTER - 1:
+            movement_delta = settings.block_size - movement_delta * self._sub_step
         if direction == DIR_DOWN:
             y += pos_delta
             del_size = (settings.block_size, movement_delta)
@@ -101,10 +205,10 @@ class SnakeBody(ImageObject):
             x += pos_delta
             del_size = (movement_delta, settings.block_size)
         s_x, s_y = self._pos
-        screen.blit(self._image.subsurface(((x - s_x, y - s_y) + del_size)), (x, y))
+        dirty_rects.add(screen.blit(self._image.subsurface(((x - s_x, y - s_y) + del_size)), (x, y)))
 
     def round_tail(self, screen):
-        counter = self._movement_counter + 1
+        counter = self._sub_step + 1
         if counter == MOVEMENT_COUNTER:
             (x, y), direction = self._current_block
             counter = 0
@@ -116,27 +220,20 @@ class SnakeBody(ImageObject):
             movement_delta = settings.block_size - movement_delta * counter
         if direction == DIR_DOWN:
             y += pos_delta
-            del_size = (settings.block_size, movement_delta)
         elif direction == DIR_UP:
             y += settings.block_size - pos_delta - movement_delta
-            del_size = (settings.block_size, movement_delta)
         elif direction == DIR_LEFT:
             x += settings.block_size - pos_delta - movement_delta
-            del_size = (movement_delta, settings.block_size)
         else:
             x += pos_delta
-            del_size = (movement_delta, settings.block_size)
-        image = self._tail_image.copy()
-        image.repos((x, y), HEAD_DIRECTIONS[direction])
-        image.size = sorted(del_size, reverse=True)
-        image.draw(screen)
+        dirty_rects.add(screen.blit(self._tail_frames[(direction, counter)], (x, y)))
 
     def delete(self, screen):
         (x, y), direction = self._last_block
         movement_delta = cal_movement()
-        pos_delta = movement_delta * self._movement_counter
-        if self._movement_counter == MOVEMENT_COUNTER - 1:
-            movement_delta = settings.block_size - movement_delta * self._movement_counter + 1
+        pos_delta = movement_delta * self._sub_step
+        if self._sub_step == MOVEMENT_COUNTER - 1:
+            movement_delta = settings.block_size - movement_delta * self._sub_step + 1
         if direction == DIR_DOWN:
             y += pos_delta
             del_size = (settings.block_size, movement_delta)
@@ -149,39 +246,53 @@ class SnakeBody(ImageObject):
         else:
             x += pos_delta
             del_size = (movement_delta, settings.block_size)
-        screen.fill(settings.background_color, (x, y) + del_size)
+        dirty_rects.add(screen.fill(settings.background_color, (x, y) + del_size))
+
+    def draw(self, screen):
+        if self._image is None:
+            self._load_sprites()
+        if self._tail_key != (settings.block_size, settings.background_color):
+            self._load_tail_frames()
+        self._fill(screen)
+        if self._current_block[0] != self._last_block[0]:
+            self.delete(screen)
+            self.round_tail(screen)
 
     def add(self, value=1):
         for _ in range(value):
-            self._queue.put((self._pos, self.direction))
+            self._blocks.push(self._pos, self.direction)
 
-    def repos(self, pos, _=None):
+    def repos(self, pos):
         self._pos = pos
-        self._queue.put((self._pos, self.direction))
+        self._blocks.push(self._pos, self.direction)
 
-    def update(self, pos, screen):
+    def step(self, pos):
+        self._sub_step = self._movement_counter
         if self._movement_counter == 0:
             self.repos(pos)
             self._last_block = self._current_block
-            self._current_block = self._queue.get()
+            self._current_block = self._blocks.pop()
             if self._current_block[0] == self._last_block[0]:
                 self._current_block = self._last_block
-        self.draw(screen)
-        if self._current_block[0] != self._last_block[0]:
-            self.delete(screen)
-            self.round_tail(screen)
+        if self._movement_counter == MOVEMENT_COUNTER - 1 and self._current_block[0] != self._last_block[0]:
+            self._snake.grid.release(self._last_block[0], self._snake.grid_kind)
         self._movement_counter = (self._movement_counter + 1) % MOVEMENT_COUNTER
 
     def reset(self):
-        self._queue = Queue()
+        self._blocks.clear()
         self._pos = (-100, -100)
         self.add(STARTER_SIZE)
         self._movement_counter = 0
-        self._current_block = self._queue.get()
+        self._sub_step = 0
+        self._current_block = self._blocks.pop()
         self._last_block = None
 
     def __len__(self):
-        return self._queue.qsize()
+        return len(self._blocks)
+
+    @property
+    def pos(self):
+        return self._pos
 
     @property
     def direction(self):
@@ -189,33 +300,34 @@ class SnakeBody(ImageObject):
 
 
 class Snake(ScreenObject):
-    def __init__(self, screen: pygame.Surface, data, index: int = 0, players: int = 1):
+    def __init__(self, grid: OccupancyGrid, index: int = 0, players: int = 1):
         super(Snake, self).__init__((0, 0), (settings.block_size, settings.block_size))
+        self._grid = grid
         self._index = index
         self._players = players
         self._got_dir = False
         self._dsq = False
         self._direction = DIR_UP
         self._movement_counter = 0
+        self._sub_step = None
+        self._redirected = False
+        self._ate = False
         self._speed = settings.snake_speed
-        width, height = screen_grids(screen)
-        height = int(height - height * DATA_ZONE_SIZE)
-        self._grid_width = width
-        self._grid_height = height
+        self._grid_width = grid.width
+        self._grid_height = grid.play_height
         self._teleport = settings.teleport
-        self.set_starter_pos(screen)
-        self._head = ImageObject(self._pos, settings.head1_image if self._index == 0 else settings.head2_image,
-                                 settings.snake_size)
-        self._eyes = SnakeEyes(self._head, (0, 0), screen)
+        self.set_starter_pos()
+        self._skin = None
+        self._head = None
+        self._eyes = None
         self._body = SnakeBody(self, self._index)
-        self._volume = data.volume
-        self.draw(screen)
 
-    def set_starter_pos(self, screen):
-        x, y = screen.get_size()
+    def set_starter_pos(self):
+        x, y = self._grid.size
         x = x // (self._players + 1) * (self._players - self._index)
         y = y // 2
         self._pos = round_to_grid((x, y))
+        self._grid.occupy(self._pos, self.grid_kind)
 
     @property
     def _grid_size(self):
@@ -229,41 +341,23 @@ class Snake(ScreenObject):
     def _max_y(self):
         return (self._grid_height - 1) * settings.snake_speed
 
-    @property
-    def _front_line(self):
-        length = self._size[0]
-        if self._direction == DIR_UP:
-            x, y = self.rect.topleft
-            return [(x + i, y) for i in range(length)]
-        elif self._direction == DIR_RIGHT:
-            x, y = self.rect.topright
-            return [(x - 1, y + i) for i in range(length)]
-        elif self._direction == DIR_DOWN:
-            x, y = self.rect.bottomleft
-            return [(x + i, y-1) for i in range(length)]
-        x, y = self.rect.topleft
-        return [(x, y + i) for i in range(length)]
-
-    def _is_disqualified(self, screen: pygame.Surface, data_zone):
-        if self.is_touch(data_zone):
-            return not self._teleport
-        try:
-            for pos in self._front_line:
-                if screen.get_at(pos)[:-1] != settings.background_color:
-                    return True
-            return False
-        except IndexError:
+    def _is_disqualified(self):
+        kind = self._grid.kind_at(self._pos)
+        if kind in [GRID_OUTSIDE, GRID_DATA_ZONE]:
             return not self._teleport
+        return kind != GRID_EMPTY
 
-    @property
-    def _next_pos(self):
+    def peek(self, direction):
+        """
+        :return: the position of the head after one movement in the given direction
+        """
         x, y = self._pos
         movement = self._speed
-        if self._direction == DIR_UP:
+        if direction == DIR_UP:
             y -= movement
-        elif self._direction == DIR_DOWN:
+        elif direction == DIR_DOWN:
             y += movement
-        elif self._direction == DIR_RIGHT:
+        elif direction == DIR_RIGHT:
             x += movement
         else:
             x -= movement
@@ -271,6 +365,10 @@ class Snake(ScreenObject):
             x, y = self._cal_teleport((x, y))
         return x, y
 
+    @property
+    def _next_pos(self):
+        return self.peek(self._direction)
+
     def _cal_teleport(self, pos):
         x, y = pos
         if x < 0:
@@ -291,6 +389,14 @@ class Snake(ScreenObject):
     def dsq(self):
         return self._dsq
 
+    @property
+    def grid(self):
+        return self._grid
+
+    @property
+    def grid_kind(self):
+        return GRID_SNAKE + self._index
+
     @property
     def on_grid(self):
         x, y = self._pos
@@ -306,17 +412,17 @@ class Snake(ScreenObject):
     def direction(self):
         return self._direction
 
-    def _play_redirect(self):
-        play_sound(SNAKE_CHANNEL, REDIRECT_SOUND, self._volume.value)
-
-    def _play_eat(self):
-        play_sound(FOOD_CHANNEL, EAT_SOUND, self._volume.value)
+    def _load_sprites(self, screen):
+        self._skin = settings.skin_atlas
+        self._head = ImageObject(self._pos, self._skin.head(self._index), color_key=None)
+        self._eyes = SnakeEyes(self._head, (0, 0), screen)
 
-    def update_head(self, screen, food):
-        x, y = self._head.pos
-        movement = cal_movement()
-        if self._movement_counter == MOVEMENT_COUNTER - 1:
-            movement = settings.block_size - movement * self._movement_counter
+    @property
+    def _head_pos(self):
+        x, y = self._body.pos
+        movement = cal_movement() * (self._sub_step + 1)
+        if self._sub_step == MOVEMENT_COUNTER - 1:
+            movement = settings.block_size
         if self._direction == DIR_UP:
             y -= movement
         elif self._direction == DIR_DOWN:
@@ -325,28 +431,48 @@ class Snake(ScreenObject):
             x += movement
         else:
             x -= movement
-        self._head.repos((x, y), HEAD_DIRECTIONS[self._direction])
-        self._head.draw(screen)
+        return x, y
+
+    def draw_head(self, screen, food, pos=None):
+        self._head.repos(self._head_pos if pos is None else pos, HEAD_DIRECTIONS[self._direction])
+        dirty_rects.add(screen.blit(self._skin.head(self._index, self._head.direction), self._head.pos))
         self._eyes.draw(screen, food.pos)
 
-    def update(self, screen: pygame.Surface, food, data_zone):
+    def draw(self, screen, food):
+        if self._sub_step is None:
+            return
+        if self._head is None:
+            self._load_sprites(screen)
+        if self._redirected:
+            play_sound(SNAKE_CHANNEL, REDIRECT_SOUND)
+        if self._ate:
+            play_sound(FOOD_CHANNEL, EAT_SOUND)
+        self._redirected = self._ate = False
+        if self._sub_step == 0:
+            self.draw_head(screen, food, self._body.pos)
+            self._body.draw(screen)
+            self.draw_head(screen, food)
+        else:
+            self.draw_head(screen, food)
+            self._body.draw(screen)
+
+    def step(self, food):
+        self._sub_step = self._movement_counter
         if self._movement_counter == 0:
+            self._redirected = self._ate = False
             if self._got_dir is not False:
                 self._direction = self._got_dir
                 self._got_dir = False
-                self._play_redirect()
+                self._redirected = True
             current_pos = self._pos
             self._pos = self._next_pos
-            if not self._check_food(food, screen):
-                self._dsq = self._is_disqualified(screen, data_zone)
-            self._head.repos(current_pos, HEAD_DIRECTIONS[self._direction])
-            self._head.draw(screen)
-            self._eyes.draw(screen, food.pos)
-            self._body.update(current_pos, screen)
-            self.update_head(screen, food)
+            if not self._check_food(food):
+                self._dsq = self._is_disqualified()
+            if not self._dsq:
+                self._grid.occupy(self._pos, self.grid_kind)
+            self._body.step(current_pos)
         else:
-            self.update_head(screen, food)
-            self._body.update(self._pos, screen)
+            self._body.step(self._pos)
         self._movement_counter = (self._movement_counter + 1) % MOVEMENT_COUNTER
         return self._dsq
 
@@ -372,35 +498,37 @@ class Snake(ScreenObject):
     def add(self, value=1):
         self._body.add(value)
 
-    def _check_food(self, food, screen):
+    def _check_food(self, food):
         check = self.is_touch(food)
         if check:
-            food.replace(screen)
-            self._play_eat()
+            food.replace()
+            self._ate = True
             self.add(1)
         return check
 
     def __len__(self):
         return len(self._body) + 1
 
-    def reset(self, screen):
-        self.set_starter_pos(screen)
+    def reset(self):
+        self.set_starter_pos()
         self._direction = DIR_UP
+        self._got_dir = False
+        self._dsq = False
         self._movement_counter = 0
-        self._head.repos(self._pos)
+        self._sub_step = None
+        self._redirected = self._ate = False
         self._body.reset()
-        self.draw(screen)
 
 
 class BattleSnake(Snake):
-    def __init__(self, screen: pygame.Surface, data, boundary_line: pygame.Rect, index: int = 0, players: int = 2):
-        super(BattleSnake, self).__init__(screen, data, index, players)
+    def __init__(self, grid: OccupancyGrid, boundary_line: pygame.Rect, index: int = 0, players: int = 2):
+        super(BattleSnake, self).__init__(grid, index, players)
         self._boundary_line = boundary_line
 
-    def _is_disqualified(self, screen: pygame.Surface, data_zone):
-        if self._boundary_line.colliderect(self.rect):
+    def _is_disqualified(self):
+        if self._grid.kind_at(self._pos) == GRID_BOUNDARY:
             return not self._teleport
-        return super(BattleSnake, self)._is_disqualified(screen, data_zone)
+        return super(BattleSnake, self)._is_disqualified()
 
     def _cal_teleport(self, pos):
         x, y = pos
@@ -420,30 +548,34 @@ class BattleSnake(Snake):
 
 
 class SurvivalSnake(Snake):
-    def __init__(self, screen: pygame.Surface, data, index: int = 0, players: int = 2):
-        super(SurvivalSnake, self).__init__(screen, data, index, players)
+    def __init__(self, grid: OccupancyGrid, index: int = 0, players: int = 2):
+        super(SurvivalSnake, self).__init__(grid, index, players)
         self._timer = 0
 
-    def update(self, screen: pygame.Surface, food, data_zone):
-        dsq = super(SurvivalSnake, self).update(screen, food, data_zone)
+    def step(self, food):
+        dsq = super(SurvivalSnake, self).step(food)
         self._timer += 1
         if self._timer >= self._timer_delta:
             self.add(1)
             self._timer -= self._timer_delta
         return dsq
 
-    def _check_food(self, food, screen):
+    def _check_food(self, food):
         check = self.is_touch(food)
         if check:
-            food.replace(screen)
-            self._play_eat()
+            food.replace()
+            self._ate = True
             self._timer -= self._timer_delta
         return check
 
+    def reset(self):
+        super(SurvivalSnake, self).reset()
+        self._timer = 0
+
 
 class SurvivalBattleSnake(BattleSnake):
-    def __init__(self, screen: pygame.Surface, data, boundary_line: pygame.Rect, index: int = 0, players: int = 2):
-        super(BattleSnake, self).__init__(screen, data, index, players)
+    def __init__(self, grid: OccupancyGrid, boundary_line: pygame.Rect, index: int = 0, players: int = 2):
+        super(BattleSnake, self).__init__(grid, index, players)
         self._boundary_line = boundary_line
         self._timer = 0
 
@@ -451,22 +583,26 @@ class SurvivalBattleSnake(BattleSnake):
     def _timer_delta(self):
         return super(SurvivalBattleSnake, self)._timer_delta/2
 
-    def update(self, screen: pygame.Surface, food, data_zone):
-        dsq = super(SurvivalBattleSnake, self).update(screen, food, data_zone)
+    def step(self, food):
+        dsq = super(SurvivalBattleSnake, self).step(food)
         self._timer += 1
         if self._timer >= self._timer_delta:
             self.add(1)
             self._timer -= self._timer_delta
         return dsq
 
-    def _check_food(self, food, screen):
+    def _check_food(self, food):
         check = self.is_touch(food)
         if check:
-            food.replace(screen)
-            self._play_eat()
+            food.replace()
+            self._ate = True
             self._timer -= self._timer_delta
         return check
 
+    def reset(self):
+        super(SurvivalBattleSnake, self).reset()
+        self._timer = 0
+
 
 def cal_movement():
     return settings.block_size // MOVEMENT_COUNTER
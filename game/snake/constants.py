@@ -6,6 +6,9 @@ HEAD_DIRECTIONS = {DIR_UP: 0, DIR_RIGHT: 270, DIR_DOWN: 180, DIR_LEFT: 90}
 
 STARTER_SIZE: int = 2
 MOVEMENT_COUNTER = 4
+BODY_BUFFER_SIZE = 64
+EYE_ANGLES = 32
+EYE_MIN_PUPIL = 3
 
 BATTLE_TIMER = 60
 SURVIVAL_TIMER = 20
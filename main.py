@@ -1,4 +1,5 @@
-import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from game import *
 from paint import *
 
@@ -151,11 +152,7 @@ def edit_settings(screen: pygame.Surface, data: DataManager):
                             submit_settings(data, conf_bars, conf_colors, teleport_button)
                             raise SettingsChanged
                     elif reset_button.is_touch_mouse():
-                        try:
-                            os.remove(SETTING_FILE)
-                            settings.reset()
-                        except FileNotFoundError:
-                            pass
+                        settings.reset_to_default()
                         raise SettingsChanged
                     elif user_button.is_touch_mouse():
                         try:
@@ -221,25 +218,34 @@ def lobby(data: DataManager):
         data.delete(screen)
 
 
-def check_details(boxes, is_login):
-    values = boxes.value
+def check_details(values, is_login):
+    """
+    runs on a worker thread, so it only reads the database
+    :return: None, raise LoginError when the details are wrong
+    """
     if is_login:
         username, password = values
-        index = db.user_id(username)
-        if index == -1:
+        user_password = db.password(username)
+        if user_password is None:
             raise LoginError('username not exist in the database!')
-        if db.users_password[index] != password:
+        if user_password != password:
             raise LoginError("username and password don't match!")
-        settings.set_username(username)
     else:
         username, password, confirm = values
-        index = db.user_id(username)
-        if index != -1:
+        if db.password(username) is not None:
             raise LoginError('username already exist in the database!')
         if password != confirm:
             raise LoginError("passwords don't match!")
-        db.add_user(username, password)
-        settings.set_username(username)
+
+
+def finish_log_in(values, is_login):
+    username = values[0]
+    if not is_login:
+        try:
+            db.add_user(username, values[1])
+        except sqlite3.IntegrityError:
+            raise LoginError('username already exist in the database!')
+    settings.set_username(username)
 
 
 def log_in(data: DataManager):
@@ -254,49 +260,67 @@ def log_in(data: DataManager):
                            RED, '', settings.text_size, data, CENTER)
     register_button = Button(screen.get_rect().center, "don't have an account? register here!",
                              RED, '', settings.text_size, data, CENTER)
-    while data.running:
-        button = register_button if is_login else log_in_button
-        boxes = login_boxes if is_login else register_boxes
-        events = pygame.event.get()
-        data.handle_events(events)
-        boxes.active(events)
-        for event in events:
-            if event.type == pygame.QUIT:
-                data.running = False
-                raise QuitPressed
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == MOUSE_LEFT:
-                    if button.is_touch_mouse():
-                        is_login = not is_login
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RETURN:
-                    try:
-                        check_details(boxes, is_login)
-                        return
-                    except LoginError as error:
-                        data += str(error)
-        boxes.draw(screen)
-        button.draw(screen)
-        data.draw(screen)
-        pygame.display.flip()
-        clock.tick(LOBBY_REFRESH_RATE)
-        data.delete(screen)
+    check = None    # the details check running on the worker thread: (future, values)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        while data.running:
+            button = register_button if is_login else log_in_button
+            boxes = login_boxes if is_login else register_boxes
+            events = pygame.event.get()
+            data.handle_events(events)
+            boxes.active(events)
+            for event in events:
+                if event.type == pygame.QUIT:
+                    data.running = False
+                    raise QuitPressed
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    if event.button == MOUSE_LEFT:
+                        if button.is_touch_mouse() and check is None:
+                            is_login = not is_login
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_RETURN and check is None:
+                        values = boxes.value
+                        check = executor.submit(check_details, values, is_login), values
+            if check is not None and check[0].done():
+                future, values = check
+                check = None
+                try:
+                    future.result()
+                    finish_log_in(values, is_login)
+                    return
+                except LoginError as error:
+                    data += str(error)
+            boxes.draw(screen)
+            button.draw(screen)
+            data.draw(screen)
+            pygame.display.flip()
+            clock.tick(LOBBY_REFRESH_RATE)
+            data.delete(screen)
+
+
+def warm_up_fonts():
+    fonts.warm_up([settings.text_size * scale for scale in FONT_WARM_UP_SCALES])
 
 
 def main():
     pygame.init()
-    data = DataManager()
     try:
-        log_in(data)
-        while True:
-            try:
-                lobby(data)
-            except SettingsChanged:
-                pass
-    except QuitPressed:
-        settings.write_volume(data.volume.value)
-    pygame.quit()
-    db.close()
+        sounds.preload(skip=[BACKGROUND_SOUND])
+        data = DataManager()
+        try:
+            warm_up_fonts()
+            log_in(data)
+            while True:
+                try:
+                    warm_up_fonts()
+                    lobby(data)
+                except SettingsChanged:
+                    pass
+        except QuitPressed:
+            settings.write_volume(data.volume.value)
+    finally:
+        settings.flush()    # the write behind thread is a daemon, a pending write is lost if it is not flushed
+        pygame.quit()
+        db.close()
 
 
 if __name__ == '__main__':
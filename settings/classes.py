@@ -3,6 +3,9 @@ from basicFont import *
 import pygame
 import math
 import pickle
+import hashlib
+import threading
+import time
 from .database import db
 
 
@@ -29,25 +32,44 @@ class VolumeBar(ImageObject):
         self._mouse_down = False
         self._is_active = False
         self._is_mute = False
+        self._bar_rect = None
+        self._colored_title = None
+        self._colored_key = None
         self.value = starter_value
 
     @property
     def color(self):
         # הצבע בין אדום לירוק כאשר אדום מתקבל כאשר הערך 0 והירוק כאשר הערך 1
-        return int((1 - self.value) * 255), int(self.value * 255), 0
+        value = round(self.value * VOLUME_COLOR_STEPS) / VOLUME_COLOR_STEPS
+        return int((1 - value) * 255), int(value * 255), 0
 
     @property
     def colored_title(self):
-        return self.this_title.copy_color(BLACK, self.color)
+        """
+        the title in the color of the value, colored again only when the title or the color step changes
+        """
+        key = (self.this_title, self.color)
+        if key != self._colored_key:
+            self._colored_title = self.this_title.copy_color(BLACK, self.color)
+            self._colored_key = key
+        return self._colored_title
 
     def draw(self, screen):
+        bar_rect = None
         if self._is_active:
             color = self.color
             # מייצר את הפס
-            pygame.draw.line(screen, color, self._line_rect.topleft, self._line_rect.bottomleft, self._line_rect.width)
+            bar_rect = pygame.draw.line(screen, color, self._line_rect.topleft, self._line_rect.bottomleft,
+                                        self._line_rect.width)
             # מצייר את הנקודה
-            pygame.draw.circle(screen, color, self._dot, settings.dot_radius)
-        self.colored_title.draw(screen)
+            bar_rect = bar_rect.union(pygame.draw.circle(screen, color, self._dot, settings.dot_radius))
+        title = self.colored_title
+        title.draw(screen)
+        dirty_rects.add(title.rect)
+        # the bar of the last frame is erased by the screen under it
+        dirty_rects.add(self._bar_rect)
+        dirty_rects.add(bar_rect)
+        self._bar_rect = bar_rect
 
     @property
     def value(self):
@@ -125,6 +147,25 @@ class VolumeBar(ImageObject):
         return started_value != self.value
 
 
+class SkinAtlas:
+    """
+    the display-ready snake sprites of a skin at one size: scaled, colour keyed, and the heads in every rotation
+    """
+    def __init__(self, skin, size: float):
+        heads = [ImageObject((0, 0), pygame.surfarray.make_surface(image), size).image for image in skin[:2]]
+        self._heads = [{angle: pygame.transform.rotate(head, angle) for angle in SKIN_ANGLES} for head in heads]
+        self._bodies = [ImageObject((0, 0), pygame.surfarray.make_surface(image), size).image for image in skin[2:]]
+
+    def head(self, index: int, angle: int = 0) -> pygame.Surface:
+        """
+        :param index: the snake index, the first snake has the first head and all the others the second
+        """
+        return self._heads[min(index, 1)][angle % 360]
+
+    def body(self, index: int) -> pygame.Surface:
+        return self._bodies[min(index, 1)]
+
+
 class Settings:
     def __init__(self):
         self._resolution = None
@@ -133,13 +174,20 @@ class Settings:
         self._base_text_size = None
         self._head1_image = self._head2_image = None
         self._body1_image = self._body2_image = None
+        self._skin_hash = None
+        self._skin_atlases: Dict[Tuple[str, float], SkinAtlas] = {}
         self._bg_color = None
         self._food_color = None
         self._teleport = None
         self._has_change = None
         self._last_volume = None
         self._username = None
+        self._write_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._write_time = None
+        self._writer = None
         self.reset()
+        self.set_default_skin()
         self._has_change = False
 
     @property
@@ -202,6 +250,25 @@ class Settings:
     def body2_image(self):
         return pygame.surfarray.make_surface(self._body2_image)
 
+    @property
+    def skin_atlas(self) -> SkinAtlas:
+        """
+        the sprites of the current skin at the current snake size, built once for every skin content and size
+        """
+        key = (self._skin_hash, self.snake_size)
+        if key not in self._skin_atlases:
+            self._skin_atlases[key] = SkinAtlas([self._head1_image, self._head2_image, self._body1_image,
+                                                 self._body2_image], self.snake_size)
+        return self._skin_atlases[key]
+
+    def _set_skin(self, skin):
+        self._head1_image, self._head2_image, self._body1_image, self._body2_image = skin
+        content = hashlib.sha1()
+        for image in skin:
+            content.update(str(image.shape).encode())
+            content.update(image.tobytes())
+        self._skin_hash = content.hexdigest()
+
     @property
     def background_color(self):
         return self._bg_color
@@ -230,9 +297,22 @@ class Settings:
     def snake_size(self):
         return settings.base_block_size / DEFAULT_BLOCK_SIZE * settings.delta_size
 
+    @property
+    def game_params(self):
+        """
+        the settings that change the game itself (and not only the way it looks)
+        """
+        return self._resolution, self._base_block_size, self._refresh_rate, self._teleport
+
+    def set_game_params(self, params):
+        """
+        change the game settings for this run only, without writing them to the settings file
+        """
+        self._resolution, self._base_block_size, self._refresh_rate, self._teleport = params
+
     def set_username(self, username):
         self._username = username
-        self._head1_image, self._head2_image, self._body1_image, self._body2_image = db.get_skin(self._username)
+        self._set_skin(db.get_skin(self._username))
 
     def set_params(self, lst):
         lst = iter(lst)
@@ -244,26 +324,24 @@ class Settings:
         self._food_color = next(lst)
         self._teleport = next(lst)
         self._last_volume = next(lst)
-        self._head1_image, self._head2_image, self._body1_image, self._body2_image = db.get_skin(self._username)
         self._has_change = True
 
     def rewrite_skin(self, *skin):
         db.set_skin(self._username, *skin)
-        self.reset()
+        self._set_skin(list(skin))
 
     def rewrite_skin_to_default(self):
         db.set_skin(self._username)
-        self.reset()
+        self.set_default_skin()
 
     def set_default_skin(self):
-        self._head1_image, self._head2_image, self._body1_image, self._body2_image = db.get_skin()
+        self._set_skin(db.get_skin())
 
     def set_to_default(self):
         self._resolution: int = 710
         self._base_block_size: int = 29
         self._refresh_rate: int = 30
         self._base_text_size: int = 20
-        self.set_default_skin()
         self._bg_color = BLACK
         self._food_color = YELLOW
         self._teleport = True
@@ -271,22 +349,56 @@ class Settings:
         self._has_change = True
 
     def rewrite(self):
-        try:
-            with open(SETTING_FILE, 'wb+') as my_file:
-                lst = [self._resolution,
-                       self._base_block_size,
-                       self._refresh_rate,
-                       self._base_text_size,
-                       self._bg_color,
-                       self._food_color,
-                       self._teleport,
-                       self._last_volume]
-                my_file.write(pickle.dumps(lst))
-        except Exception as e:
-            print(f'can not write settings! {type(e)} -> {e}')
-        self.reset()
+        """
+        write the settings to the settings file later, all the changes until SETTINGS_WRITE_DELAY seconds pass
+        without a change are written together (the settings in memory are the real ones)
+        """
+        with self._write_lock:
+            self._write_time = time.monotonic() + SETTINGS_WRITE_DELAY
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_behind, daemon=True)
+                self._writer.start()
+
+    def _write_behind(self):
+        while True:
+            with self._write_lock:
+                if self._write_time is None:
+                    self._writer = None
+                    return
+                delay = self._write_time - time.monotonic()
+                if delay <= 0:
+                    self._writer = None
+                    break
+            time.sleep(delay)
+        self.flush()
+
+    def _cancel_write(self):
+        with self._write_lock:
+            self._write_time = None
+
+    def flush(self):
+        """
+        write the settings now, to a temporary file that replaces the settings file (never half written)
+        """
+        self._cancel_write()
+        lst = [self._resolution,
+               self._base_block_size,
+               self._refresh_rate,
+               self._base_text_size,
+               self._bg_color,
+               self._food_color,
+               self._teleport,
+               self._last_volume]
+        with self._flush_lock:
+            try:
+                with open(SETTING_FILE + TEMP_FILE_SUFFIX, 'wb') as my_file:
+                    my_file.write(pickle.dumps(lst))
+                os.replace(SETTING_FILE + TEMP_FILE_SUFFIX, SETTING_FILE)
+            except Exception as e:
+                print(f'can not write settings! {type(e)} -> {e}')
 
     def reset(self):
+        self._cancel_write()
         try:
             with open(SETTING_FILE, 'rb') as my_file:
                 content = pickle.loads(my_file.read())
@@ -295,8 +407,15 @@ class Settings:
             print(f'can not read settings! {type(e)} -> {e}')
             self.set_to_default()
 
-    def write_volume(self, volume: float):
+    def reset_to_default(self):
+        self._cancel_write()
+        try:
+            os.remove(SETTING_FILE)
+        except FileNotFoundError:
+            pass
         self.reset()
+
+    def write_volume(self, volume: float):
         self._last_volume = volume
         self.rewrite()
 
@@ -316,8 +435,8 @@ class DataManager:
         self._screen = None
         self._username = None
         self._password = None
-        pygame.mixer.music.set_volume(settings.last_volume)
-        pygame.mixer.music.load(BACKGROUND_SOUND)
+        self._set_volume(settings.last_volume)
+        pygame.mixer.music.load(asset_path(BACKGROUND_SOUND))
         pygame.mixer.music.play(-1)
 
     @property
@@ -350,12 +469,20 @@ class DataManager:
 
     def __iadd__(self, other: str):
         if self._running:
-            self._temp_msgs += TempMsg(other, self._screen, volume=self._volume.value)
+            self._temp_msgs += TempMsg(other, self._screen)
         return self
 
     def handle_events(self, events):
         if self._volume.handle_events(events):
-            pygame.mixer.music.set_volume(self._volume.value)
+            self._set_volume(self._volume.value)
+
+    @staticmethod
+    def _set_volume(volume: float):
+        """
+        the volume bar sets the volume of the music and of the sound bank
+        """
+        pygame.mixer.music.set_volume(volume)
+        sounds.volume = volume
 
     def draw(self, screen):
         self._volume.draw(screen)
@@ -371,9 +498,9 @@ class DataManager:
         self._running = True
         self._volume = VolumeBar(screen, 0)
         self._volume.value = settings.last_volume
-        pygame.mixer.music.set_volume(self._volume.value)
+        self._set_volume(self._volume.value)
         self._temp_msgs = TempMsgList(screen)
-        self._background_img = pygame.transform.scale(pygame.image.load(BACKGROUND_IMG), screen.get_size())
+        self._background_img = assets.scaled(BACKGROUND_IMG, screen.get_size())
         self._screen = screen
         self.delete(screen)
 
@@ -382,17 +509,16 @@ class TempMsg(Message):
     """
     המחלקה האחראית על הצגת הודעות זמניות
     """
-    def __init__(self, text: str, screen, color: COLOR = WHITE, play_error_sound: bool = True, volume: float = 1):
+    def __init__(self, text: str, screen, color: COLOR = WHITE, play_error_sound: bool = True):
         """
         הפעולה הבונה
         :param text: ראה במחלקת האב
         :param color: הצבע ההתחלתי של ההודעה
         :param play_error_sound: האם להפעיל סאונד של שגיאה או לא
-        :param volume: עוצמת הווליום של סאונד השגיאה (מספר בין 0 ל-1)
         """
         super(TempMsg, self).__init__(screen.get_rect().center, text, settings.text_size, color, CENTER)
         if play_error_sound:
-            play_sound(TEMP_MSG_CHANNEL, ERROR_SOUND, volume)
+            play_sound(TEMP_MSG_CHANNEL, ERROR_SOUND)
         self._speed = self.rect.centery / (LOBBY_REFRESH_RATE * TEMP_MSG_EXIST_TIMER)
         self._color_dec = [item / (LOBBY_REFRESH_RATE * TEMP_MSG_EXIST_TIMER) for item in self.color]
 
@@ -443,6 +569,7 @@ class TempMsgList:
 
     def draw(self, screen):
         to_remove = [msg for msg in self._lst if msg.draw(screen)]
+        dirty_rects.extend(msg.rect for msg in self._lst)
         for msg in to_remove:
             self._lst.remove(msg)
 
@@ -451,8 +578,20 @@ class TempMsgList:
 
 
 class GameBlock(BlockObject):
+    def __init__(self, pos: POSITION, size: POSITION, color, position_at: str = TOPLEFT):
+        super(GameBlock, self).__init__(pos, size, color, position_at)
+        self._drawn_rect = None
+
     def delete(self, screen):
-        screen.fill(settings.background_color, self.rect)
+        if self._drawn_rect is not None:
+            screen.fill(settings.background_color, self._drawn_rect)
+            dirty_rects.add(self._drawn_rect)
+
+    def draw(self, screen):
+        self.delete(screen)
+        super(GameBlock, self).draw(screen)
+        self._drawn_rect = self.rect
+        dirty_rects.add(self._drawn_rect)
 
 
 def screen_grids(screen: pygame.Surface):
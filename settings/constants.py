@@ -4,6 +4,8 @@ from definitions import *
 RESOLUTION_RATIO: float = 9/16
 BASE_RESOLUTION = 720
 SETTING_FILE = r'settings.txt'
+SETTINGS_WRITE_DELAY: float = 1
+TEMP_FILE_SUFFIX = r'.tmp'
 
 VOLUME_IMAGES: List[str] = [r'files\buttons\volume0.png', r'files\buttons\volume1.png', r'files\buttons\volume2.png',
                             r'files\buttons\volume3.png']
@@ -13,6 +15,9 @@ DATA_ZONE_SIZE: float = 0.2
 BASE_OBSTACLE_SPEED = 20
 LOBBY_REFRESH_RATE = 30
 TEMP_MSG_EXIST_TIMER = 4
+VOLUME_COLOR_STEPS = 32
+SKIN_ANGLES: List[int] = [0, 90, 180, 270]
+FONT_WARM_UP_SCALES: List[int] = [1, 2]
 
 
 ERROR_SOUND = r'files\sounds\error.ogg'
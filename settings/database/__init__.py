@@ -1,28 +1,45 @@
 import pickle
 import sqlite3
+import threading
+import numpy as np
 from .constants import *
 from definitions import *
 
 
+def encode_skin(image) -> bytes:
+    """
+    :param image: (width, height, 3) array of a skin image
+    :return: the skin blob, a small header and the raw RGB bytes
+    """
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    width, height, _ = image.shape
+    return SKIN_HEADER.pack(SKIN_MAGIC, SKIN_VERSION, width, height) + image.tobytes()
+
+
+def decode_skin(blob: bytes) -> np.ndarray:
+    """
+    :return: the (width, height, 3) array of the skin blob, a read only view of the blob (no copy).
+             blobs of the old format (a pickled array) are still read
+    """
+    if blob[:len(SKIN_MAGIC)] != SKIN_MAGIC:
+        return pickle.loads(blob)
+    _, version, width, height = SKIN_HEADER.unpack_from(blob)
+    return np.frombuffer(blob, dtype=np.uint8, count=width * height * 3, offset=SKIN_HEADER.size).reshape(
+        (width, height, 3))
+
+
 class Database:
-    def __init__(self):
-        self._connection = sqlite3.connect('database.db')
+    def __init__(self, file_name: str = DATABASE_FILE):
+        self._file_name = file_name
+        self._connection = sqlite3.connect(file_name)
         self._cursor = self._connection.cursor()
-        self._table_ids = {}
+        self._thread = threading.current_thread()
+        self._local = threading.local()
+        self._thread_connections: List[sqlite3.Connection] = []
+        self._thread_connections_lock = threading.Lock()
         self.create_tables()
-        self._set_tables_id()
-
-    def _set_tables_id(self):
-        tables_command = '''SELECT name FROM sqlite_schema WHERE type ='table' AND name NOT LIKE 'sqlite_%';'''
-        tables = self._cursor.execute(tables_command).fetchall()
-        for (table,) in tables:
-            try:
-                command = f'{SELECT_COMMAND} {INDEX} FROM {table} DESC;'
-                indexes = [a for (a, ) in self._cursor.execute(command).fetchall()]
-                index = max(indexes) + 1
-            except ValueError:
-                index = 0
-            self._table_ids[table] = index
+        if self._cursor.execute('PRAGMA user_version;').fetchone()[0] < SKIN_VERSION:
+            self.migrate_skins()
 
     def _create_table(self, table_name, parameters):
         values = [f'{v} {TYPES[t]}' for v, t in parameters]
@@ -43,13 +60,34 @@ class Database:
                                          (USER_HEAD2, bytes),
                                          (USER_BODY1, bytes),
                                          (USER_BODY2, bytes)])
+        index_command = f"{SELECT_COMMAND} 1 FROM sqlite_schema WHERE type = 'index' AND name = ?;"
+        if self._cursor.execute(index_command, [USERS_USERNAME_INDEX]).fetchone() is None:
+            self._remove_duplicate_users()
+            self._cursor.execute(f'{CREATE_UNIQUE_INDEX_COMMAND} {USERS_USERNAME_INDEX} ON {TABLE_USERS}'
+                                 f'({USER_USERNAME});')
+        self.save()
+
+    def _remove_duplicate_users(self):
+        """
+        a database made before the username index may have a username more than once (register checked and then
+        inserted), keep the first user of every username (the lowest id, the one the login and the skin used)
+        """
+        command = f"""
+        DELETE FROM {TABLE_USERS} WHERE {INDEX} NOT IN
+         (SELECT MIN({INDEX}) FROM {TABLE_USERS} GROUP BY {USER_USERNAME});
+        """
+        removed = self._cursor.execute(command).rowcount
+        if removed > 0:
+            print(f'removed {removed} duplicate users from the database!')
 
     def add_user(self, username, password):
-        command = f'''{INSERT_COMMAND} {TABLE_USERS} VALUES (?, ?, ?, ?, ?, ?, ?);'''
-        head1_image = head2_image = pickle.dumps(pygame.surfarray.array3d(pygame.image.load(HEAD_IMAGE)))
-        body1_image = body2_image = pickle.dumps(pygame.surfarray.array3d(pygame.image.load(BODY_IMAGE)))
-        self._cursor.execute(command, (self._index(TABLE_USERS), username, password,
-                                       head1_image, head2_image, body1_image, body2_image))
+        """
+        the id is given by sqlite (the id column is the rowid, a new row gets the biggest id + 1), so there is no
+        table scan on start and two processes can add users to the same database
+        """
+        command = f'''{INSERT_COMMAND} {TABLE_USERS} VALUES (NULL, ?, ?, ?, ?, ?, ?);'''
+        head1_image, head2_image, body1_image, body2_image = [encode_skin(image) for image in self._default_skin()]
+        self._cursor.execute(command, (username, password, head1_image, head2_image, body1_image, body2_image))
         self.save()
 
     def set_skin(self, username: str, *args):
@@ -61,13 +99,7 @@ class Database:
         {USER_BODY2} = ?
          WHERE {USER_USERNAME} = ?;
         """
-        if args:
-            new_args: List[Any] = [pickle.dumps(a) for a in args]
-        else:
-            new_args: List[Any] = [pickle.dumps(a) for a in [pygame.surfarray.array3d(pygame.image.load(HEAD_IMAGE)),
-                                                             pygame.surfarray.array3d(pygame.image.load(HEAD_IMAGE)),
-                                                             pygame.surfarray.array3d(pygame.image.load(BODY_IMAGE)),
-                                                             pygame.surfarray.array3d(pygame.image.load(BODY_IMAGE))]]
+        new_args: List[Any] = [encode_skin(a) for a in (args if args else self._default_skin())]
         new_args.append(username)
         self._cursor.execute(command, new_args)
         self.save()
@@ -79,11 +111,46 @@ class Database:
          WHERE {USER_USERNAME} = ?;
         """
         if username is None:
-            return [pygame.surfarray.array3d(pygame.image.load(HEAD_IMAGE)),
-                    pygame.surfarray.array3d(pygame.image.load(HEAD_IMAGE)),
-                    pygame.surfarray.array3d(pygame.image.load(BODY_IMAGE)),
-                    pygame.surfarray.array3d(pygame.image.load(BODY_IMAGE))]
-        return [pickle.loads(skin) for skin in self._cursor.execute(command, [username]).fetchone()]
+            return self._default_skin()
+        return [decode_skin(skin) for skin in self._cursor.execute(command, [username]).fetchone()]
+
+    @staticmethod
+    def _default_skin():
+        return [pygame.surfarray.array3d(assets.image(HEAD_IMAGE)),
+                pygame.surfarray.array3d(assets.image(HEAD_IMAGE)),
+                pygame.surfarray.array3d(assets.image(BODY_IMAGE)),
+                pygame.surfarray.array3d(assets.image(BODY_IMAGE))]
+
+    def migrate_skins(self, batch: int = SKIN_MIGRATION_BATCH):
+        """
+        rewrite the skins of the old format (pickled arrays) in the skin blob format, batch rows at a time so the
+        whole table is never in memory, then mark the database as migrated
+        """
+        select = f"""
+        {SELECT_COMMAND} {INDEX}, {USER_HEAD1}, {USER_HEAD2}, {USER_BODY1}, {USER_BODY2}
+         FROM {TABLE_USERS}
+         WHERE {INDEX} > ? ORDER BY {INDEX} LIMIT ?;
+        """
+        update = f"""
+        {UPDATE_COMMAND} {TABLE_USERS} SET
+        {USER_HEAD1} = ?,
+        {USER_HEAD2} = ?,
+        {USER_BODY1} = ?,
+        {USER_BODY2} = ?
+         WHERE {INDEX} = ?;
+        """
+        last = -1
+        while True:
+            rows = self._connection.execute(select, [last, batch]).fetchall()
+            if not rows:
+                break
+            changes = [[encode_skin(decode_skin(skin)) for skin in skins] + [index] for index, *skins in rows
+                       if any(skin[:len(SKIN_MAGIC)] != SKIN_MAGIC for skin in skins)]
+            self._cursor.executemany(update, changes)
+            self.save()
+            last = rows[-1][0]
+        self._cursor.execute(f'PRAGMA user_version = {SKIN_VERSION};')
+        self.save()
 
     def save(self):
         self._connection.commit()
@@ -91,11 +158,11 @@ class Database:
     def close(self):
         self.save()
         self._connection.close()
-
-    def _index(self, table):
-        index = self._table_ids[table]
-        self._table_ids[table] += 1
-        return index
+        with self._thread_connections_lock:
+            for connection in self._thread_connections:
+                connection.close()
+            self._thread_connections.clear()
+        self._local = threading.local()
 
     def user_id(self, username):
         command = f"""{SELECT_COMMAND} {INDEX} FROM {TABLE_USERS} WHERE {USER_USERNAME} = ?;"""
@@ -105,12 +172,26 @@ class Database:
             index = -1
         return index
 
-    @property
-    def users_password(self):
-        command = f"""
-        {SELECT_COMMAND} {USER_PASSWORD} FROM {TABLE_USERS} ORDER BY {INDEX};
+    def _thread_connection(self):
         """
-        return [password for password, in self._cursor.execute(command).fetchall()]
+        a sqlite connection can be used only by the thread that made it, so every other thread gets its own
+        """
+        if threading.current_thread() is self._thread:
+            return self._connection
+        if not hasattr(self._local, 'connection'):
+            # made in this thread and used only by it, check_same_thread is off so close can close it
+            self._local.connection = sqlite3.connect(self._file_name, check_same_thread=False)
+            with self._thread_connections_lock:
+                self._thread_connections.append(self._local.connection)
+        return self._local.connection
 
+    def password(self, username):
+        """
+        one row lookup through the username index, safe to call from any thread
+        :return: the password of the user, None if there is no such user
+        """
+        command = f"""{SELECT_COMMAND} {USER_PASSWORD} FROM {TABLE_USERS} WHERE {USER_USERNAME} = ?;"""
+        row = self._thread_connection().execute(command, [username]).fetchone()
+        return None if row is None else row[0]
 
 db = Database()
@@ -1,3 +1,5 @@
+import struct
+
 T_NONE = 'NULL'
 T_INT = 'INTEGER'
 T_FLOAT = 'REAL'
@@ -14,6 +16,7 @@ CREATE_TABLE_COMMAND = '''CREATE TABLE IF NOT EXISTS'''
 INSERT_COMMAND = '''INSERT INTO'''
 SELECT_COMMAND = '''SELECT'''
 UPDATE_COMMAND = '''UPDATE'''
+CREATE_UNIQUE_INDEX_COMMAND = '''CREATE UNIQUE INDEX IF NOT EXISTS'''
 
 TABLE_USERS = 'users'
 
@@ -26,5 +29,15 @@ USER_HEAD2 = 'head2'
 USER_BODY1 = 'body1'
 USER_BODY2 = 'body2'
 
+USERS_USERNAME_INDEX = 'users_username'
+
+DATABASE_FILE = r'database.db'
+
+# skin blob: header (magic, format version, width, height) and the raw RGB bytes of the (width, height, 3) image
+SKIN_MAGIC = b'SKIN'
+SKIN_VERSION = 1
+SKIN_HEADER = struct.Struct('<4sBHH')
+SKIN_MIGRATION_BATCH = 1000
+
 HEAD_IMAGE = r'files\animation\head.png'
 BODY_IMAGE = r'files\animation\body.png'
@@ -0,0 +1 @@
+from .functions import *
@@ -0,0 +1,9 @@
+from game import *
+
+
+KEY_DIRECTIONS = {pygame.K_UP: DIR_UP, pygame.K_DOWN: DIR_DOWN, pygame.K_LEFT: DIR_LEFT, pygame.K_RIGHT: DIR_RIGHT}
+TOURNAMENT_MODES = {'battle': BattleSimulation, 'survival battle': SurvivalBattleSimulation}
+
+MAX_MATCH_TICKS = 60 * 60 * 30
+TABLE_FILE = r'tournament.csv'
+TABLE_HEADER = ['policy', 'matches', 'wins', 'draws', 'losses', 'win rate', 'mean score']
@@ -0,0 +1,114 @@
+import csv
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .constants import *
+
+
+def random_policy(simulation: Simulation, snake: Snake):
+    if random.random() < 0.2:
+        return random.choice(snake.optional_arrows)
+    return None
+
+
+def greedy_policy(simulation: Simulation, snake: Snake):
+    """
+    go to the free neighbour cell that is the closest to the food
+    """
+    food = simulation.food_of(snake)
+    best = None
+    for key in [None] + snake.optional_arrows:
+        pos = snake.peek(snake.direction if key is None else KEY_DIRECTIONS[key])
+        if pos != food.pos and not simulation.grid.is_free(pos):
+            continue
+        food_distance = distance(pos, food.pos)
+        if best is None or food_distance < best[0]:
+            best = (food_distance, key)
+    return best[1] if best else None
+
+
+POLICIES: Dict[str, Callable[[Simulation, Snake], Optional[int]]] = {'random': random_policy,
+                                                                     'greedy': greedy_policy}
+
+
+def play_match(mode: str, policies: List[str], seed: int, max_ticks: int = MAX_MATCH_TICKS):
+    """
+    play one headless match, one policy per snake
+    :return: the match result (winner index, None for a draw)
+    """
+    random.seed(seed)   # the random numbers of the policies, the game has its own
+    simulation = TOURNAMENT_MODES[mode](get_resolution(), seed)
+    players = [POLICIES[name] for name in policies]
+    ticks = 0
+    try:
+        while ticks < max_ticks:
+            inputs = []
+            if ticks % MOVEMENT_COUNTER == 0:
+                for snake, policy in zip(simulation.snakes, players):
+                    key = policy(simulation, snake)
+                    if key is not None:
+                        inputs.append((snake.index, key))
+            simulation.step(inputs)
+            ticks += 1
+    except UserDsq:
+        pass
+    ranks = [(not snake.dsq, len(snake)) for snake in simulation.snakes]
+    winner = None if ranks.count(max(ranks)) > 1 else ranks.index(max(ranks))
+    return {'mode': mode, 'seed': seed, 'policies': policies, 'winner': winner, 'ticks': ticks,
+            'scores': [len(snake) for snake in simulation.snakes]}
+
+
+def run_tournament(policies: List[str], matches: int, mode: str = 'battle', seed: int = 0, workers=None):
+    """
+    play every ordered pair of policies against each other on a process pool
+    :param matches: number of matches of every pair
+    :param seed: the seed of the first match, every match gets its own seed
+    :param workers: number of processes (default: number of cores)
+    :return: generator of the match results, in the order they finish
+    """
+    pairs = list(itertools.permutations(policies, 2))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(play_match, mode, list(pair), seed + index * len(pairs) + pair_index)
+                   for index in range(matches) for pair_index, pair in enumerate(pairs)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def results_table(results):
+    table = {}
+    for result in results:
+        for index, policy in enumerate(result['policies']):
+            row = table.setdefault(policy, {'matches': 0, 'wins': 0, 'draws': 0, 'losses': 0, 'score': 0})
+            row['matches'] += 1
+            row['score'] += result['scores'][index]
+            if result['winner'] is None:
+                row['draws'] += 1
+            elif result['winner'] == index:
+                row['wins'] += 1
+            else:
+                row['losses'] += 1
+    return table
+
+
+def write_table(table, file_name: str = TABLE_FILE):
+    with open(file_name, 'w', newline='') as my_file:
+        writer = csv.writer(my_file)
+        writer.writerow(TABLE_HEADER)
+        for policy, row in sorted(table.items(), key=lambda item: -item[1]['wins'] / item[1]['matches']):
+            writer.writerow([policy, row['matches'], row['wins'], row['draws'], row['losses'],
+                             f"{row['wins'] / row['matches']:.3f}", f"{row['score'] / row['matches']:.2f}"])
+
+
+def tournament(policies: List[str], matches: int, mode: str = 'battle', seed: int = 0, workers=None,
+               file_name: str = TABLE_FILE):
+    results = []
+    for result in run_tournament(policies, matches, mode, seed, workers):
+        results.append(result)
+        print(f"{len(results)}: {' vs '.join(result['policies'])} seed {result['seed']} -> "
+              f"{'draw' if result['winner'] is None else result['policies'][result['winner']]}")
+    table = results_table(results)
+    write_table(table, file_name)
+    return table
+
+
+if __name__ == '__main__':
+    tournament(list(POLICIES), 50)